@@ -8,7 +8,6 @@
 
 import os
 import sys
-import argparse
 from datetime import datetime
 import pandas as pd
 
@@ -64,8 +63,8 @@ def configure_fonts():
             'DejaVu Sans', 'Liberation Sans', 'Arial', 'Helvetica', 'Verdana', 'Tahoma'
         ]
         
-        # 查找可用字体
-        available_fonts = [f.name for f in fm.fontManager.ttflist]
+        # 查找可用字体（集合查找，逐个检查候选字体时无需扫描列表）
+        available_fonts = {f.name for f in fm.fontManager.ttflist}
         
         # 先选择拉丁字符字体
         latin_font = next((font for font in latin_fonts if font in available_fonts), 'sans-serif')
@@ -107,8 +106,7 @@ def find_data_files():
     data_files = []
     
     # 确保数据目录存在
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+    os.makedirs(DATA_DIR, exist_ok=True)
     
     # 查找CSV文件
     csv_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.csv')]
@@ -181,24 +179,19 @@ def generate_sample_data():
         import random
         from datetime import datetime, timedelta
         
-        data = []
         start_date = datetime.now() - timedelta(days=30)
+        # 日期字符串对所有城市相同，只格式化一次
+        date_strings = pd.date_range(start_date, periods=30).strftime("%Y-%m-%d").tolist()
         
-        for city in cities:
-            for i in range(30):
-                date = start_date + timedelta(days=i)
-                level = random.choice(levels)
-                data.append({
-                    "city": city,
-                    "addTime": date.strftime("%Y-%m-%d"),
-                    "level": level,
-                })
-        
-        df = pd.DataFrame(data)
+        # 按列构造数据（城市在外层、日期在内层，随机等级的抽取顺序与逐行生成时相同）
+        df = pd.DataFrame({
+            "city": [city for city in cities for _ in date_strings],
+            "addTime": date_strings * len(cities),
+            "level": [random.choice(levels) for _ in range(len(cities) * len(date_strings))],
+        })
         
         # 确保数据目录存在
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
+        os.makedirs(DATA_DIR, exist_ok=True)
         
         file_path = os.path.join(DATA_DIR, "simple_sample_data.csv")
         df.to_csv(file_path, index=False)
@@ -207,6 +200,9 @@ def generate_sample_data():
 
 def parse_arguments():
     """解析命令行参数"""
+    # argparse只在解析命令行时才需要，作为模块导入时不加载
+    import argparse
+    
     parser = argparse.ArgumentParser(description='花粉数据可视化运行工具')
     parser.add_argument('--data_file', help='花粉数据文件路径 (CSV或Excel格式)')
     parser.add_argument('--cities', nargs='+', help='要显示的城市列表 (例如: 北京 上海)')
@@ -239,7 +235,12 @@ def interactive_setup():
     # 2. 加载数据文件以提供更多信息
     try:
         df = pd.read_csv(data_file) if data_file.endswith('.csv') else pd.read_excel(data_file)
-        df['addTime'] = pd.to_datetime(df['addTime'])
+        try:
+            # 按固定格式解析，跳过逐值的格式推断（同一日期在各城市重复出现，cache=True只解析一次）
+            df['addTime'] = pd.to_datetime(df['addTime'], format='%Y-%m-%d', cache=True)
+        except (ValueError, TypeError):
+            # 日期不是YYYY-MM-DD格式时退回自动推断
+            df['addTime'] = pd.to_datetime(df['addTime'])
         
         # 显示可用的城市
         available_cities = df['city'].unique().tolist()
@@ -314,8 +315,7 @@ def main():
             params['data_file'] = generate_sample_data()
     
     # 确保输出目录存在
-    if not os.path.exists(params.get('output_dir', OUTPUT_DIR)):
-        os.makedirs(params.get('output_dir', OUTPUT_DIR))
+    os.makedirs(params.get('output_dir', OUTPUT_DIR), exist_ok=True)
     
     # 运行可视化
     try:
@@ -74,34 +74,32 @@ def generate_sample_data(num_cities=5, num_days=30, random_seed=42):
         "无花粉", "极少花粉", "少量花粉", "中等花粉", "较多花粉", "大量花粉"
     ]
     
-    # 生成数据记录
-    records = []
+    # 季节性波动对所有城市相同，按天一次性计算
+    day_positions = np.arange(len(dates))
+    seasonal_factor = np.sin(np.pi * day_positions / (len(dates) / 2)) * 2
+    
+    # 按城市生成整列数据（每个城市的随机数抽取顺序与逐天生成时相同，结果保持可重复）
+    city_frames = []
     for city in cities:
         # 为每个城市生成一个花粉趋势基线
         baseline = np.random.uniform(0.5, 3.0)
         trend = np.random.uniform(-0.5, 0.5)
+        random_factor = np.random.normal(0, 0.5, len(dates))  # 随机波动
+        
+        # 计算花粉指数（缓慢的季节性趋势）及花粉等级（0-5）
+        pollen_index = np.clip(baseline + trend * (day_positions / len(dates)) + seasonal_factor + random_factor, 0, 5)
+        pollen_level = np.minimum(pollen_index.astype(int), 5)
         
-        for i, date in enumerate(dates):
-            # 生成花粉指数，有一个缓慢的季节性趋势
-            seasonal_factor = np.sin(np.pi * i / (len(dates) / 2)) * 2  # 季节性波动
-            random_factor = np.random.normal(0, 0.5)  # 随机波动
-            
-            # 计算花粉指数
-            pollen_index = max(0, min(5, baseline + trend * (i / len(dates)) + seasonal_factor + random_factor))
-            pollen_level = min(int(pollen_index), 5)  # 花粉等级，0-5
-            
-            # 创建记录
-            record = {
-                "日期": date,
-                "城市": city,
-                "花粉指数": round(pollen_index, 2),
-                "花粉等级": pollen_level,
-                "花粉等级描述": pollen_level_descriptions[pollen_level]
-            }
-            records.append(record)
+        city_frames.append(pd.DataFrame({
+            "日期": dates,
+            "城市": city,
+            "花粉指数": [round(value, 2) for value in pollen_index.tolist()],
+            "花粉等级": pollen_level,
+            "花粉等级描述": np.array(pollen_level_descriptions)[pollen_level]
+        }))
     
     # 创建DataFrame
-    df = pd.DataFrame(records)
+    df = pd.concat(city_frames, ignore_index=True)
     
     # 保存到文件
     data_dir = get_default_data_dir()
@@ -110,7 +108,7 @@ def generate_sample_data(num_cities=5, num_days=30, random_seed=42):
     df.to_csv(file_path, index=False, encoding="utf-8")
     
     print(f"示例数据已保存到: {file_path}")
-    print(f"生成了 {len(cities)} 个城市 {len(dates)} 天的数据，共 {len(records)} 条记录")
+    print(f"生成了 {len(cities)} 个城市 {len(dates)} 天的数据，共 {len(df)} 条记录")
     
     return file_path
 
@@ -9,20 +9,11 @@ import os
 import re
 import glob
 
-def fix_formatter_function(html_content):
-    """
-    修复格式化函数的语法错误
-    """
-    # 定义用于匹配formatter函数的正则表达式
-    pattern = r'"formatter": function\(params\) \{([^}]*)\},'
-    
-    # 替换函数
-    def formatter_replacement(match):
-        # 获取原始内容
-        content = match.group(1)
-        
-        # 格式化JavaScript代码
-        formatted_js = """function(params) {
+# 匹配formatter函数的正则表达式（模块加载时编译一次）
+formatter_pattern = re.compile(r'"formatter": function\(params\) \{([^}]*)\},')
+
+# 替换后的formatter函数（与原函数内容无关，所有匹配都替换为同一段格式化后的代码）
+formatted_formatter = '"formatter": ' + """function(params) {
                 var levelMap = {
                     0: '暂无',
                     1: '很低',
@@ -43,14 +34,14 @@ def fix_formatter_function(html_content):
                 var touchTip = isMobile ? '<br/>(点击可放大地图)' : '';
                 
                 return params.name + '<br/>花粉等级: ' + levelText + touchTip;
-            }"""
-        
-        return f'"formatter": {formatted_js},'
-    
+            }""" + ','
+
+def fix_formatter_function(html_content):
+    """
+    修复格式化函数的语法错误
+    """
     # 使用正则表达式查找并替换
-    fixed_content = re.sub(pattern, formatter_replacement, html_content)
-    
-    return fixed_content
+    return formatter_pattern.sub(lambda match: formatted_formatter, html_content)
 
 def fix_map_files(directory):
     """
@@ -68,6 +59,11 @@ def fix_map_files(directory):
             # 修复内容
             fixed_content = fix_formatter_function(content)
             
+            # 内容没有变化（不含需要修复的formatter）时跳过写回
+            if fixed_content == content:
+                print(f"- 无需修复: {os.path.basename(file_path)}")
+                continue
+            
             # 写回文件
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(fixed_content)
@@ -12,14 +12,23 @@ import pandas as pd
 import numpy as np
 import argparse
 import webbrowser
+import traceback
 from datetime import datetime
 from flask import Flask, render_template, jsonify, request
 from pyecharts import options as opts
-from pyecharts.charts import Map, Geo, EffectScatter, Grid
+from pyecharts.charts import Geo
 from pyecharts.globals import ThemeType
-from pyecharts.commons.utils import JsCode
+from pyecharts.charts.base import default as chart_json_default
+from pyecharts.commons.utils import JsCode, replace_placeholder
 import threading
 import time
+from types import MappingProxyType
+
+# orjson为可选依赖，不可用时使用pyecharts默认的json序列化
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 定义全局变量
 app = Flask(__name__, 
@@ -28,12 +37,186 @@ app = Flask(__name__,
 data_file = ""
 available_dates = []
 pollen_data = None
+date_groups = {}  # 按日期预先分组的数据，格式：{日期: DataFrame}
 
 # 花粉等级定义
 pollen_levels = [
     0, 2.5, 5.0, 7.5, 15, 30, 60, 90
 ]
 
+# 花粉等级映射字典（从文本等级到数值）
+pollen_level_map = MappingProxyType({
+    '暂无': 0,
+    '很低': 1,
+    '低': 2,
+    '较低': 3,
+    '中': 4,
+    '偏高': 5,
+    '高': 6,
+    '较高': 7,
+    '很高': 8,
+    '极高': 9
+})
+
+# 花粉等级数值到颜色的映射
+level_color_map = {
+    0: "#C4A39F",  # 暂无
+    1: "#81CB31",  # 很低
+    2: "#A1FF3D",  # 低
+    3: "#C9FF76",  # 较低
+    4: "#F5EE32",  # 中
+    5: "#FFD429",  # 偏高
+    6: "#FF642E",  # 高
+    7: "#FFAF13",  # 较高
+    8: "#FF2319",  # 很高
+    9: "#CC0000"   # 极高
+}
+
+# 花粉等级数值到名称的映射
+level_name_map = {
+    0: '暂无',
+    1: '很低',
+    2: '低',
+    3: '较低',
+    4: '中',
+    5: '偏高',
+    6: '高',
+    7: '较高',
+    8: '很高',
+    9: '极高'
+}
+
+# 视觉映射的分段配置（每个等级一段）
+level_pieces = [
+    {"min": level, "max": level, "label": name, "color": level_color_map[level]}
+    for level, name in level_name_map.items()
+]
+
+# 散点提示框格式化函数（所有地图共用，模块加载时创建一次）
+map_tooltip_formatter = JsCode("""function(params) {
+    var levelMap = {
+        0: '暂无',
+        1: '很低',
+        2: '低',
+        3: '较低',
+        4: '中',
+        5: '偏高',
+        6: '高',
+        7: '较高',
+        8: '很高',
+        9: '极高'
+    };
+    var value = params.value[2];
+    var levelText = levelMap[value] || '未知';
+    return params.name + '<br/>花粉等级: ' + levelText;
+}""")
+
+# 散点系列的固定配置项（各等级、各日期相同，模块加载时创建一次）
+map_series_label_opts = opts.LabelOpts(
+    is_show=True,
+    formatter="{b}",
+    position="right",
+    font_size=10,
+    color="#333"
+)
+map_series_itemstyle_opts = opts.ItemStyleOpts(opacity=0.8)
+map_series_tooltip_opts = opts.TooltipOpts(formatter=map_tooltip_formatter)
+
+def create_effect_opts(color):
+    """
+    创建散点的涟漪特效配置
+    """
+    return opts.EffectOpts(
+        is_show=True,
+        scale=3.5,
+        period=4,
+        color=color,
+        brush_type="stroke"
+    )
+
+# 各花粉等级的涟漪特效配置
+level_effect_opts = {level: create_effect_opts(color) for level, color in level_color_map.items()}
+
+# 城市到省份的映射（模块加载时构建一次，避免每次创建地图都重建；只读，防止被意外修改）
+city_to_province = MappingProxyType({
+    # 直辖市
+    '北京': '北京', '上海': '上海', '天津': '天津', '重庆': '重庆',
+    # 华北地区
+    '石家庄': '河北', '保定': '河北', '唐山': '河北', '秦皇岛': '河北', '邯郸': '河北', '邢台': '河北', 
+    '张家口': '河北', '承德': '河北', '沧州': '河北', '廊坊': '河北', '衡水': '河北',
+    '太原': '山西', '大同': '山西', '阳泉': '山西', '长治': '山西', '晋城': '山西', '朔州': '山西', 
+    '晋中': '山西', '运城': '山西', '忻州': '山西', '临汾': '山西', '吕梁': '山西', '榆林': '陕西',
+    '呼和浩特': '内蒙古', '包头': '内蒙古', '乌海': '内蒙古', '赤峰': '内蒙古', '通辽': '内蒙古', 
+    '鄂尔多斯': '内蒙古', '呼伦贝尔': '内蒙古', '巴彦淖尔': '内蒙古', '乌兰察布': '内蒙古',
+    # 东北地区
+    '沈阳': '辽宁', '大连': '辽宁', '鞍山': '辽宁', '抚顺': '辽宁', '本溪': '辽宁', '丹东': '辽宁', 
+    '锦州': '辽宁', '营口': '辽宁', '阜新': '辽宁', '辽阳': '辽宁', '盘锦': '辽宁', '铁岭': '辽宁', 
+    '朝阳': '辽宁', '葫芦岛': '辽宁',
+    '长春': '吉林', '吉林市': '吉林', '四平': '吉林', '辽源': '吉林', '通化': '吉林', '白山': '吉林', 
+    '松原': '吉林', '白城': '吉林',
+    '哈尔滨': '黑龙江', '齐齐哈尔': '黑龙江', '鸡西': '黑龙江', '鹤岗': '黑龙江', '双鸭山': '黑龙江', 
+    '大庆': '黑龙江', '伊春': '黑龙江', '佳木斯': '黑龙江', '七台河': '黑龙江', '牡丹江': '黑龙江', 
+    '黑河': '黑龙江', '绥化': '黑龙江',
+    # 华东地区
+    '南京': '江苏', '无锡': '江苏', '徐州': '江苏', '常州': '江苏', '苏州': '江苏', '南通': '江苏', 
+    '连云港': '江苏', '淮安': '江苏', '盐城': '江苏', '扬州': '江苏', '镇江': '江苏', '泰州': '江苏', 
+    '宿迁': '江苏',
+    '杭州': '浙江', '宁波': '浙江', '温州': '浙江', '嘉兴': '浙江', '湖州': '浙江', '绍兴': '浙江', 
+    '金华': '浙江', '衢州': '浙江', '舟山': '浙江', '台州': '浙江', '丽水': '浙江',
+    '合肥': '安徽', '芜湖': '安徽', '蚌埠': '安徽', '淮南': '安徽', '马鞍山': '安徽', '淮北': '安徽', 
+    '铜陵': '安徽', '安庆': '安徽', '黄山': '安徽', '滁州': '安徽', '阜阳': '安徽', '宿州': '安徽', 
+    '巢湖': '安徽', '六安': '安徽', '亳州': '安徽', '池州': '安徽', '宣城': '安徽',
+    '福州': '福建', '厦门': '福建', '莆田': '福建', '三明': '福建', '泉州': '福建', '漳州': '福建', 
+    '南平': '福建', '龙岩': '福建', '宁德': '福建',
+    '南昌': '江西', '景德镇': '江西', '萍乡': '江西', '九江': '江西', '新余': '江西', '鹰潭': '江西', 
+    '赣州': '江西', '吉安': '江西', '宜春': '江西', '抚州': '江西', '上饶': '江西',
+    '济南': '山东', '青岛': '山东', '淄博': '山东', '枣庄': '山东', '东营': '山东', '烟台': '山东', 
+    '潍坊': '山东', '济宁': '山东', '泰安': '山东', '威海': '山东', '日照': '山东', '莱芜': '山东', 
+    '临沂': '山东', '德州': '山东', '聊城': '山东', '滨州': '山东', '菏泽': '山东',
+    # 中南地区
+    '郑州': '河南', '开封': '河南', '洛阳': '河南', '平顶山': '河南', '安阳': '河南', '鹤壁': '河南', 
+    '新乡': '河南', '焦作': '河南', '濮阳': '河南', '许昌': '河南', '漯河': '河南', '三门峡': '河南', 
+    '南阳': '河南', '商丘': '河南', '信阳': '河南', '周口': '河南', '驻马店': '河南',
+    '武汉': '湖北', '黄石': '湖北', '十堰': '湖北', '宜昌': '湖北', '襄阳': '湖北', '鄂州': '湖北', 
+    '荆门': '湖北', '孝感': '湖北', '荆州': '湖北', '黄冈': '湖北', '咸宁': '湖北', '随州': '湖北',
+    '长沙': '湖南', '株洲': '湖南', '湘潭': '湖南', '衡阳': '湖南', '邵阳': '湖南', '岳阳': '湖南', 
+    '常德': '湖南', '张家界': '湖南', '益阳': '湖南', '郴州': '湖南', '永州': '湖南', '怀化': '湖南', 
+    '娄底': '湖南',
+    '广州': '广东', '韶关': '广东', '深圳': '广东', '珠海': '广东', '汕头': '广东', '佛山': '广东', 
+    '江门': '广东', '湛江': '广东', '茂名': '广东', '肇庆': '广东', '惠州': '广东', '梅州': '广东', 
+    '汕尾': '广东', '河源': '广东', '阳江': '广东', '清远': '广东', '东莞': '广东', '中山': '广东', 
+    '潮州': '广东', '揭阳': '广东', '云浮': '广东',
+    '南宁': '广西', '柳州': '广西', '桂林': '广西', '梧州': '广西', '北海': '广西', '防城港': '广西', 
+    '钦州': '广西', '贵港': '广西', '玉林': '广西', '百色': '广西', '贺州': '广西', '河池': '广西', 
+    '来宾': '广西', '崇左': '广西',
+    '海口': '海南', '三亚': '海南', '三沙': '海南', '儋州': '海南',
+    # 西南地区
+    '成都': '四川', '自贡': '四川', '攀枝花': '四川', '泸州': '四川', '德阳': '四川', '绵阳': '四川', 
+    '广元': '四川', '遂宁': '四川', '内江': '四川', '乐山': '四川', '南充': '四川', '眉山': '四川', 
+    '宜宾': '四川', '广安': '四川', '达州': '四川', '雅安': '四川', '巴中': '四川', '资阳': '四川',
+    '贵阳': '贵州', '六盘水': '贵州', '遵义': '贵州', '安顺': '贵州', '铜仁': '贵州', '黔西南': '贵州', 
+    '毕节': '贵州', '黔东南': '贵州', '黔南': '贵州',
+    '昆明': '云南', '曲靖': '云南', '玉溪': '云南', '保山': '云南', '昭通': '云南', '丽江': '云南', 
+    '普洱': '云南', '临沧': '云南',
+    '拉萨': '西藏', '日喀则': '西藏', '昌都': '西藏', '林芝': '西藏', '山南': '西藏', '那曲': '西藏', 
+    '阿里': '西藏',
+    # 西北地区
+    '西安': '陕西', '铜川': '陕西', '宝鸡': '陕西', '咸阳': '陕西', '渭南': '陕西', '延安': '陕西', 
+    '汉中': '陕西', '榆林': '陕西', '安康': '陕西', '商洛': '陕西',
+    '兰州': '甘肃', '嘉峪关': '甘肃', '金昌': '甘肃', '白银': '甘肃', '天水': '甘肃', '武威': '甘肃', 
+    '张掖': '甘肃', '平凉': '甘肃', '酒泉': '甘肃', '庆阳': '甘肃', '定西': '甘肃', '陇南': '甘肃',
+    '西宁': '青海', '海东': '青海', '海北': '青海', '黄南': '青海', '海南州': '青海', '果洛': '青海', 
+    '玉树': '青海', '海西': '青海',
+    '银川': '宁夏', '石嘴山': '宁夏', '吴忠': '宁夏', '固原': '宁夏', '中卫': '宁夏',
+    '乌鲁木齐': '新疆', '克拉玛依': '新疆', '吐鲁番': '新疆', '哈密': '新疆', '昌吉': '新疆', 
+    '博尔塔拉': '新疆', '巴音郭楞': '新疆', '阿克苏': '新疆', '克孜勒苏': '新疆', '喀什': '新疆', 
+    '和田': '新疆', '伊犁': '新疆', '塔城': '新疆', '阿勒泰': '新疆',
+    # 港澳台
+    '香港': '香港', '澳门': '澳门', '台北': '台湾', '高雄': '台湾', '台中': '台湾', '台南': '台湾', 
+    '基隆': '台湾', '新竹': '台湾', '嘉义': '台湾'
+})
+
+
 # 创建html目录（如果不存在）
 os.makedirs("html", exist_ok=True)
 # 创建templates目录（如果不存在）
@@ -43,7 +226,7 @@ def load_data(file_path):
     """
     加载花粉数据文件
     """
-    global pollen_data, available_dates
+    global pollen_data, available_dates, date_groups
     
     print(f"开始加载数据文件: {file_path}")
     
@@ -53,7 +236,23 @@ def load_data(file_path):
     
     try:
         print(f"读取CSV文件...")
-        pollen_data = pd.read_csv(file_path)
+        # 只读取用到的列（花粉等级取值很少，使用分类类型）
+        required_columns = ['日期', '城市', '花粉等级']
+        read_options = {'usecols': required_columns, 'dtype': {'花粉等级': 'category'}}
+        try:
+            try:
+                pollen_data = pd.read_csv(file_path, engine='pyarrow', **read_options)
+            except ImportError:
+                # 未安装pyarrow时使用默认的C解析引擎
+                pollen_data = pd.read_csv(file_path, **read_options)
+        except ValueError:
+            # 缺少必要的列时usecols会报错，此时才单独读取表头，找出缺少的列
+            columns = pd.read_csv(file_path, nrows=0).columns
+            missing_columns = [col for col in required_columns if col not in columns]
+            if not missing_columns:
+                raise
+            print(f"错误：数据文件缺少必要的列：{', '.join(missing_columns)}")
+            sys.exit(1)
         print(f"数据形状: {pollen_data.shape}")
         print(f"数据列: {', '.join(pollen_data.columns)}")
         
@@ -61,25 +260,23 @@ def load_data(file_path):
         if '日期' in pollen_data.columns:
             print(f"转换日期列...")
             pollen_data['日期'] = pd.to_datetime(pollen_data['日期'])
-            available_dates = sorted(pollen_data['日期'].dt.strftime('%Y-%m-%d').unique())
+            # 一次性按日期分组，之后每次请求地图只需字典查找，无需重新扫描整张表；
+            # 直接按datetime64分组（按天归一化），只对每个分组的日期格式化一次字符串，不为每行生成字符串
+            date_groups = {
+                day.strftime('%Y-%m-%d'): frame
+                for day, frame in pollen_data.groupby(pollen_data['日期'].dt.normalize())
+            }
+            available_dates = list(date_groups)  # 分组键已按日期排序
             print(f"找到 {len(available_dates)} 个日期")
         else:
             print("错误：数据文件缺少'日期'列")
             sys.exit(1)
             
-        # 检查必要的列
-        required_columns = ['日期', '城市', '花粉等级']
-        missing_columns = [col for col in required_columns if col not in pollen_data.columns]
-        if missing_columns:
-            print(f"错误：数据文件缺少必要的列：{', '.join(missing_columns)}")
-            sys.exit(1)
-            
         print(f"已成功加载数据文件: {file_path}")
         print(f"可用日期: {', '.join(available_dates)}")
         
     except Exception as e:
         print(f"加载数据时出错: {str(e)}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
@@ -87,16 +284,31 @@ def filter_data_by_date(date_str):
     """
     按日期筛选数据
     """
-    global pollen_data
-    
     try:
-        date = pd.to_datetime(date_str)
-        filtered_data = pollen_data[pollen_data['日期'].dt.strftime('%Y-%m-%d') == date_str]
+        filtered_data = date_groups.get(date_str)
+        if filtered_data is None:
+            # 没有该日期的数据时返回空表（保留列结构）
+            return pollen_data.iloc[0:0]
         return filtered_data
     except Exception as e:
         print(f"筛选数据时出错: {str(e)}")
         return pd.DataFrame()
 
+class PollenGeo(Geo):
+    """
+    使用orjson以紧凑格式序列化配置项的Geo图表（orjson不可用时使用pyecharts默认实现）
+    """
+    def dump_options(self):
+        if orjson is None:
+            return super().dump_options()
+        return replace_placeholder(
+            orjson.dumps(
+                self.get_options(),
+                default=chart_json_default,
+                option=orjson.OPT_NON_STR_KEYS,
+            ).decode()
+        )
+
 def create_map(date_str):
     """
     创建花粉分布地图
@@ -108,146 +320,38 @@ def create_map(date_str):
         print(f"警告：日期 {date_str} 没有数据")
         return None
     
-    # 创建花粉等级映射字典（从文本等级到数值）
-    pollen_level_map = {
-        '暂无': 0,
-        '很低': 1,
-        '低': 2,
-        '较低': 3,
-        '中': 4,
-        '偏高': 5,
-        '高': 6,
-        '较高': 7,
-        '很高': 8,
-        '极高': 9
-    }
-    
-    # 复制数据以防止修改原始数据
-    data_copy = filtered_data.copy()
-    
-    # 将文本花粉等级转换为数值
-    data_copy['花粉数值'] = data_copy['花粉等级'].map(pollen_level_map)
+    # 将文本花粉等级批量转换为数值（整列映射，不逐行遍历）
+    level_values = filtered_data['花粉等级'].map(pollen_level_map)
+    mapped_mask = level_values.notna()
     
     # 打印未映射的花粉等级
-    unmapped_levels = set(data_copy[data_copy['花粉数值'].isna()]['花粉等级'].unique())
+    unmapped_levels = set(filtered_data.loc[~mapped_mask, '花粉等级'].unique())
     if unmapped_levels:
         print(f"警告：发现未映射的花粉等级: {unmapped_levels}")
     
-    # 准备城市数据
-    city_data = [(row['城市'], int(row['花粉数值'])) 
-                 for _, row in data_copy.iterrows() 
-                 if pd.notna(row['花粉数值'])]
+    # 准备城市数据（直接由列数组构造，不经过逐行元组）
+    city_frame = pd.DataFrame({
+        '城市': filtered_data.loc[mapped_mask, '城市'].to_numpy(),
+        '花粉数值': level_values[mapped_mask].astype(int).to_numpy()
+    })
     
     # 手动添加重庆数据（如果原始数据中没有）
-    has_chongqing = any(city == '重庆' for city, _ in city_data)
+    has_chongqing = (city_frame['城市'] == '重庆').any()
     if not has_chongqing:
         # 添加中等级别的花粉数据
-        city_data.append(('重庆', 4))
+        city_frame.loc[len(city_frame)] = ['重庆', 4]
         print("已添加重庆市的花粉数据")
     
-    # 城市到省份的映射
-    city_to_province = {
-        # 直辖市
-        '北京': '北京', '上海': '上海', '天津': '天津', '重庆': '重庆',
-        # 华北地区
-        '石家庄': '河北', '保定': '河北', '唐山': '河北', '秦皇岛': '河北', '邯郸': '河北', '邢台': '河北', 
-        '张家口': '河北', '承德': '河北', '沧州': '河北', '廊坊': '河北', '衡水': '河北',
-        '太原': '山西', '大同': '山西', '阳泉': '山西', '长治': '山西', '晋城': '山西', '朔州': '山西', 
-        '晋中': '山西', '运城': '山西', '忻州': '山西', '临汾': '山西', '吕梁': '山西', '榆林': '陕西',
-        '呼和浩特': '内蒙古', '包头': '内蒙古', '乌海': '内蒙古', '赤峰': '内蒙古', '通辽': '内蒙古', 
-        '鄂尔多斯': '内蒙古', '呼伦贝尔': '内蒙古', '巴彦淖尔': '内蒙古', '乌兰察布': '内蒙古',
-        # 东北地区
-        '沈阳': '辽宁', '大连': '辽宁', '鞍山': '辽宁', '抚顺': '辽宁', '本溪': '辽宁', '丹东': '辽宁', 
-        '锦州': '辽宁', '营口': '辽宁', '阜新': '辽宁', '辽阳': '辽宁', '盘锦': '辽宁', '铁岭': '辽宁', 
-        '朝阳': '辽宁', '葫芦岛': '辽宁',
-        '长春': '吉林', '吉林市': '吉林', '四平': '吉林', '辽源': '吉林', '通化': '吉林', '白山': '吉林', 
-        '松原': '吉林', '白城': '吉林',
-        '哈尔滨': '黑龙江', '齐齐哈尔': '黑龙江', '鸡西': '黑龙江', '鹤岗': '黑龙江', '双鸭山': '黑龙江', 
-        '大庆': '黑龙江', '伊春': '黑龙江', '佳木斯': '黑龙江', '七台河': '黑龙江', '牡丹江': '黑龙江', 
-        '黑河': '黑龙江', '绥化': '黑龙江',
-        # 华东地区
-        '南京': '江苏', '无锡': '江苏', '徐州': '江苏', '常州': '江苏', '苏州': '江苏', '南通': '江苏', 
-        '连云港': '江苏', '淮安': '江苏', '盐城': '江苏', '扬州': '江苏', '镇江': '江苏', '泰州': '江苏', 
-        '宿迁': '江苏',
-        '杭州': '浙江', '宁波': '浙江', '温州': '浙江', '嘉兴': '浙江', '湖州': '浙江', '绍兴': '浙江', 
-        '金华': '浙江', '衢州': '浙江', '舟山': '浙江', '台州': '浙江', '丽水': '浙江',
-        '合肥': '安徽', '芜湖': '安徽', '蚌埠': '安徽', '淮南': '安徽', '马鞍山': '安徽', '淮北': '安徽', 
-        '铜陵': '安徽', '安庆': '安徽', '黄山': '安徽', '滁州': '安徽', '阜阳': '安徽', '宿州': '安徽', 
-        '巢湖': '安徽', '六安': '安徽', '亳州': '安徽', '池州': '安徽', '宣城': '安徽',
-        '福州': '福建', '厦门': '福建', '莆田': '福建', '三明': '福建', '泉州': '福建', '漳州': '福建', 
-        '南平': '福建', '龙岩': '福建', '宁德': '福建',
-        '南昌': '江西', '景德镇': '江西', '萍乡': '江西', '九江': '江西', '新余': '江西', '鹰潭': '江西', 
-        '赣州': '江西', '吉安': '江西', '宜春': '江西', '抚州': '江西', '上饶': '江西',
-        '济南': '山东', '青岛': '山东', '淄博': '山东', '枣庄': '山东', '东营': '山东', '烟台': '山东', 
-        '潍坊': '山东', '济宁': '山东', '泰安': '山东', '威海': '山东', '日照': '山东', '莱芜': '山东', 
-        '临沂': '山东', '德州': '山东', '聊城': '山东', '滨州': '山东', '菏泽': '山东',
-        # 中南地区
-        '郑州': '河南', '开封': '河南', '洛阳': '河南', '平顶山': '河南', '安阳': '河南', '鹤壁': '河南', 
-        '新乡': '河南', '焦作': '河南', '濮阳': '河南', '许昌': '河南', '漯河': '河南', '三门峡': '河南', 
-        '南阳': '河南', '商丘': '河南', '信阳': '河南', '周口': '河南', '驻马店': '河南',
-        '武汉': '湖北', '黄石': '湖北', '十堰': '湖北', '宜昌': '湖北', '襄阳': '湖北', '鄂州': '湖北', 
-        '荆门': '湖北', '孝感': '湖北', '荆州': '湖北', '黄冈': '湖北', '咸宁': '湖北', '随州': '湖北',
-        '长沙': '湖南', '株洲': '湖南', '湘潭': '湖南', '衡阳': '湖南', '邵阳': '湖南', '岳阳': '湖南', 
-        '常德': '湖南', '张家界': '湖南', '益阳': '湖南', '郴州': '湖南', '永州': '湖南', '怀化': '湖南', 
-        '娄底': '湖南',
-        '广州': '广东', '韶关': '广东', '深圳': '广东', '珠海': '广东', '汕头': '广东', '佛山': '广东', 
-        '江门': '广东', '湛江': '广东', '茂名': '广东', '肇庆': '广东', '惠州': '广东', '梅州': '广东', 
-        '汕尾': '广东', '河源': '广东', '阳江': '广东', '清远': '广东', '东莞': '广东', '中山': '广东', 
-        '潮州': '广东', '揭阳': '广东', '云浮': '广东',
-        '南宁': '广西', '柳州': '广西', '桂林': '广西', '梧州': '广西', '北海': '广西', '防城港': '广西', 
-        '钦州': '广西', '贵港': '广西', '玉林': '广西', '百色': '广西', '贺州': '广西', '河池': '广西', 
-        '来宾': '广西', '崇左': '广西',
-        '海口': '海南', '三亚': '海南', '三沙': '海南', '儋州': '海南',
-        # 西南地区
-        '成都': '四川', '自贡': '四川', '攀枝花': '四川', '泸州': '四川', '德阳': '四川', '绵阳': '四川', 
-        '广元': '四川', '遂宁': '四川', '内江': '四川', '乐山': '四川', '南充': '四川', '眉山': '四川', 
-        '宜宾': '四川', '广安': '四川', '达州': '四川', '雅安': '四川', '巴中': '四川', '资阳': '四川',
-        '贵阳': '贵州', '六盘水': '贵州', '遵义': '贵州', '安顺': '贵州', '铜仁': '贵州', '黔西南': '贵州', 
-        '毕节': '贵州', '黔东南': '贵州', '黔南': '贵州',
-        '昆明': '云南', '曲靖': '云南', '玉溪': '云南', '保山': '云南', '昭通': '云南', '丽江': '云南', 
-        '普洱': '云南', '临沧': '云南',
-        '拉萨': '西藏', '日喀则': '西藏', '昌都': '西藏', '林芝': '西藏', '山南': '西藏', '那曲': '西藏', 
-        '阿里': '西藏',
-        # 西北地区
-        '西安': '陕西', '铜川': '陕西', '宝鸡': '陕西', '咸阳': '陕西', '渭南': '陕西', '延安': '陕西', 
-        '汉中': '陕西', '榆林': '陕西', '安康': '陕西', '商洛': '陕西',
-        '兰州': '甘肃', '嘉峪关': '甘肃', '金昌': '甘肃', '白银': '甘肃', '天水': '甘肃', '武威': '甘肃', 
-        '张掖': '甘肃', '平凉': '甘肃', '酒泉': '甘肃', '庆阳': '甘肃', '定西': '甘肃', '陇南': '甘肃',
-        '西宁': '青海', '海东': '青海', '海北': '青海', '黄南': '青海', '海南州': '青海', '果洛': '青海', 
-        '玉树': '青海', '海西': '青海',
-        '银川': '宁夏', '石嘴山': '宁夏', '吴忠': '宁夏', '固原': '宁夏', '中卫': '宁夏',
-        '乌鲁木齐': '新疆', '克拉玛依': '新疆', '吐鲁番': '新疆', '哈密': '新疆', '昌吉': '新疆', 
-        '博尔塔拉': '新疆', '巴音郭楞': '新疆', '阿克苏': '新疆', '克孜勒苏': '新疆', '喀什': '新疆', 
-        '和田': '新疆', '伊犁': '新疆', '塔城': '新疆', '阿勒泰': '新疆',
-        # 港澳台
-        '香港': '香港', '澳门': '澳门', '台北': '台湾', '高雄': '台湾', '台中': '台湾', '台南': '台湾', 
-        '基隆': '台湾', '新竹': '台湾', '嘉义': '台湾'
-    }
-    
-    # 为每个城市添加对应的省份
-    city_province_data = []
-    for city, value in city_data:
-        province = city_to_province.get(city)
-        if province:
-            city_province_data.append((city, province, value))
-        else:
-            print(f"警告：城市 {city} 没有对应的省份")
-    
-    # 按省份聚合数据，用于地图底图填色
-    province_values = {}
-    for city, province, value in city_province_data:
-        if province in province_values:
-            province_values[province] = max(province_values[province], value)
-        else:
-            province_values[province] = value
-    
-    # 转换为地图所需格式
-    province_data = [(province, value) for province, value in province_values.items()]
-    
-    print(f"已准备 {len(city_data)} 个城市的数据")
-    for city, value in city_data[:5]:
+    print(f"已准备 {len(city_frame)} 个城市的数据")
+    for city, value in zip(city_frame['城市'].head(), city_frame['花粉数值'].head()):
         print(f"示例数据: 城市: {city}, 花粉数值: {value}")
     
+    # 为每个城市批量查找对应的省份（只保留能对应到省份的已知城市）
+    city_frame['省份'] = city_frame['城市'].map(city_to_province)
+    for city in city_frame.loc[city_frame['省份'].isna(), '城市']:
+        print(f"警告：城市 {city} 没有对应的省份")
+    city_frame = city_frame.dropna(subset=['省份'])
+    
     # 创建初始化选项
     init_opts = opts.InitOpts(
         width="1000px", 
@@ -256,13 +360,11 @@ def create_map(date_str):
         page_title=f"全国花粉分布地图 - {date_str}"
     )
     
-    # 创建地图实例
-    map_chart = Map(init_opts=init_opts)
+    # 创建散点图实例
+    scatter = PollenGeo(init_opts=init_opts)
     
-    # 添加省份填充地图 - 设置为统一的浅灰色背景，不显示花粉等级颜色
-    map_chart.add(
-        series_name="",  # 使用空字符串作为系列名称，这样图例中不会显示省份
-        data_pair=[(p, 0) for p, _ in province_data],  # 所有省份使用相同的值
+    # 添加基础地图 - 直接作为统一浅灰色背景的省份底图，无需额外的省份填充地图和网格布局
+    scatter.add_schema(
         maptype="china",
         is_roam=True,  # 允许缩放和平移
         label_opts=opts.LabelOpts(
@@ -279,84 +381,19 @@ def create_map(date_str):
             border_width=1,
             border_color="#000000",
             opacity=0.9
-        ),
-        tooltip_opts=opts.TooltipOpts(
-            is_show=False  # 不显示省份的悬浮提示
         )
     )
     
-    # 设置全局选项
-    map_chart.set_global_opts(
-        title_opts=opts.TitleOpts(
-            title="",  # 删除主标题
-            subtitle="",  # 子标题已删除
-            pos_left="center",
-            title_textstyle_opts=opts.TextStyleOpts(
-                font_size=24,
-                color="#333333"
-            ),
-            subtitle_textstyle_opts=opts.TextStyleOpts(
-                font_size=16,
-                color="#666666"
-            )
-        ),
-        tooltip_opts=opts.TooltipOpts(
-            trigger="item"
-        )
-    )
-    
-    # 创建散点图实例
-    scatter = Geo(init_opts=init_opts)
-    
-    # 添加基础地图
-    scatter.add_schema(
-        maptype="china",
-        itemstyle_opts=opts.ItemStyleOpts(
-            color="rgba(255, 255, 255, 0)",  # 透明背景
-            border_color="rgba(255, 255, 255, 0)",  # 透明边界
-        ),
-        label_opts=opts.LabelOpts(is_show=False)  # 不显示标签
-    )
-    
-    # 颜色映射
-    color_map = {
-        0: "#C4A39F",  # 暂无
-        1: "#81CB31",  # 很低
-        2: "#A1FF3D",  # 低
-        3: "#C9FF76",  # 较低
-        4: "#F5EE32",  # 中
-        5: "#FFD429",  # 偏高
-        6: "#FF642E",  # 高
-        7: "#FFAF13",  # 较高
-        8: "#FF2319",  # 很高
-        9: "#CC0000"   # 极高
-    }
-    
-    # 等级文本映射
-    level_map = {
-        0: '暂无',
-        1: '很低',
-        2: '低',
-        3: '较低',
-        4: '中',
-        5: '偏高',
-        6: '高',
-        7: '较高',
-        8: '很高',
-        9: '极高'
+    # 按等级分组城市数据（按等级首次出现的顺序，与逐行追加的结果一致）
+    level_data_dict = {
+        int(level): [(city, int(level)) for city in level_cities]
+        for level, level_cities in city_frame['城市'].groupby(city_frame['花粉数值'], sort=False)
     }
     
-    # 按等级分组城市数据
-    level_data_dict = {}
-    for city, province, value in city_province_data:
-        if value not in level_data_dict:
-            level_data_dict[value] = []
-        level_data_dict[value].append((city, value))
-    
     # 为每个花粉等级添加一个系列
     for level, data in level_data_dict.items():
-        level_name = level_map.get(level, f"等级{level}")
-        color = color_map.get(level, "#888888")
+        level_name = level_name_map.get(level, f"等级{level}")
+        color = level_color_map.get(level, "#888888")
         
         scatter.add(
             series_name=level_name,
@@ -364,42 +401,10 @@ def create_map(date_str):
             type_="effectScatter",
             symbol_size=12,
             color=color,
-            effect_opts=opts.EffectOpts(
-                is_show=True,
-                scale=3.5,
-                period=4,
-                color=color,
-                brush_type="stroke"
-            ),
-            label_opts=opts.LabelOpts(
-                is_show=True,
-                formatter="{b}",
-                position="right",
-                font_size=10,
-                color="#333"
-            ),
-            itemstyle_opts=opts.ItemStyleOpts(opacity=0.8),
-            tooltip_opts=opts.TooltipOpts(
-                formatter=JsCode(
-                    """function(params) {
-                        var levelMap = {
-                            0: '暂无',
-                            1: '很低',
-                            2: '低',
-                            3: '较低',
-                            4: '中',
-                            5: '偏高',
-                            6: '高',
-                            7: '较高',
-                            8: '很高',
-                            9: '极高'
-                        };
-                        var value = params.value[2];
-                        var levelText = levelMap[value] || '未知';
-                        return params.name + '<br/>花粉等级: ' + levelText;
-                    }"""
-                )
-            )
+            effect_opts=level_effect_opts.get(level) or create_effect_opts(color),
+            label_opts=map_series_label_opts,
+            itemstyle_opts=map_series_itemstyle_opts,
+            tooltip_opts=map_series_tooltip_opts
         )
     
     # 添加图例
@@ -407,18 +412,7 @@ def create_map(date_str):
         visualmap_opts=opts.VisualMapOpts(
             is_show=True,
             type_="piecewise",  # 使用分段型视觉映射
-            pieces=[
-                {"min": 0, "max": 0, "label": "暂无", "color": "#C4A39F"},
-                {"min": 1, "max": 1, "label": "很低", "color": "#81CB31"},
-                {"min": 2, "max": 2, "label": "低", "color": "#A1FF3D"},
-                {"min": 3, "max": 3, "label": "较低", "color": "#C9FF76"},
-                {"min": 4, "max": 4, "label": "中", "color": "#F5EE32"},
-                {"min": 5, "max": 5, "label": "偏高", "color": "#FFD429"},
-                {"min": 6, "max": 6, "label": "高", "color": "#FF642E"},
-                {"min": 7, "max": 7, "label": "较高", "color": "#FFAF13"},
-                {"min": 8, "max": 8, "label": "很高", "color": "#FF2319"},
-                {"min": 9, "max": 9, "label": "极高", "color": "#CC0000"}
-            ],
+            pieces=level_pieces,
             pos_left="2%",  # 调整到左侧
             pos_top="middle",  # 垂直居中
             orient="vertical",  # 确保纵向显示
@@ -431,16 +425,7 @@ def create_map(date_str):
         )
     )
     
-    # 合并地图和散点图
-    from pyecharts.faker import Faker
-    from pyecharts.charts import Grid
-    
-    # 创建网格布局
-    grid = Grid(init_opts=init_opts)
-    grid.add(map_chart, grid_opts=opts.GridOpts(pos_left="10%", pos_right="10%", pos_top="10%", pos_bottom="10%"))
-    grid.add(scatter, grid_opts=opts.GridOpts(pos_left="10%", pos_right="10%", pos_top="10%", pos_bottom="10%"))
-    
-    return grid
+    return scatter
 
 # 创建主页模板
 def create_index_template():
@@ -545,11 +530,12 @@ def show_map(date):
     
     geo_chart = create_map(date)
     if geo_chart:
-        # 将地图渲染到html目录下
+        # 只渲染一次：同一份HTML既保存到html目录下，又直接作为响应返回
+        html_content = geo_chart.render_embed()
         html_path = f"html/map_{date}.html"
-        geo_chart.render(html_path)
-        # 使用render_embed直接嵌入页面
-        return geo_chart.render_embed()
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        return html_content
     else:
         return f"错误：无法为日期 {date} 创建地图"
 
@@ -622,7 +608,6 @@ def main():
         )
     except Exception as e:
         print(f"启动服务器时出错: {str(e)}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
@@ -120,12 +120,14 @@ def get_cities_dates_to_fetch(existing_df, cities_to_fetch, start_date, end_date
     # 存储需要爬取的城市和日期
     to_fetch = {}
     
+    # 一次分组得到每个城市现有的日期集合，避免对每个城市都扫描整列
+    existing_dates_by_city = existing_df.groupby('城市', sort=False)['日期'].agg(set).to_dict()
+    
     for city in cities_to_fetch:
         city_name = city['cn']
         
         # 获取此城市现有的日期数据
-        city_data = existing_df[existing_df['城市'] == city_name]
-        existing_dates = set(city_data['日期'].tolist())
+        existing_dates = existing_dates_by_city.get(city_name, set())
         
         # 计算缺失的日期
         missing_dates = [date for date in all_dates if date not in existing_dates]
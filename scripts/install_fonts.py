@@ -52,8 +52,7 @@ def get_font_dir():
         # Linux字体目录
         home = os.path.expanduser("~")
         font_dir = os.path.join(home, ".fonts")
-        if not os.path.exists(font_dir):
-            os.makedirs(font_dir, exist_ok=True)
+        os.makedirs(font_dir, exist_ok=True)
         return font_dir
 
 def get_matplotlib_font_dir():
@@ -10,7 +10,7 @@ setup(
     author="SPI2 Team",
     packages=find_packages(),
     install_requires=[
-        "matplotlib>=3.3.0",
+        "matplotlib>=3.4.0",
         "pandas>=1.1.0",
         "numpy>=1.19.0",
         "seaborn>=0.11.0",
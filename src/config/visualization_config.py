@@ -7,11 +7,14 @@
 """
 
 import os
+import re
 import sys
+import json
 import platform
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
+import functools
+import subprocess
 import warnings
+from types import MappingProxyType
 
 # 花粉等级颜色映射
 POLLEN_LEVEL_COLORS = {
@@ -23,8 +26,8 @@ POLLEN_LEVEL_COLORS = {
     "5": "#FF2319",  # E级/很高 - 红色
 }
 
-# 花粉等级的数值映射（用于排序和绘图）
-LEVEL_NUMERIC_MAP = {
+# 花粉等级的数值映射（用于排序和绘图），以只读映射导出，防止调用方意外修改共享配置
+LEVEL_NUMERIC_MAP = MappingProxyType({
     "未检测": 0,
     "很低": 1,
     "较低": 2,
@@ -33,10 +36,10 @@ LEVEL_NUMERIC_MAP = {
     "很高": 5,
     "极高": 6,
     "暂无": -1
-}
+})
 
 # 花粉等级对应的文字说明
-LEVEL_DESCRIPTIONS = {
+LEVEL_DESCRIPTIONS = MappingProxyType({
     "未检测": "无花粉",
     "很低": "不易引发过敏反应",
     "较低": "对极敏感人群可能引发过敏反应",
@@ -45,7 +48,7 @@ LEVEL_DESCRIPTIONS = {
     "很高": "极易引发过敏，减少外出，持续规范用药",
     "极高": "极易引发过敏，建议足不出户，规范用药",
     "暂无": "暂无数据"
-}
+})
 
 # 花粉等级名称映射
 POLLEN_LEVEL_NAMES = {
@@ -75,9 +78,50 @@ DEFAULT_SMALL_FIGURE_SIZE = (8, 6)
 DEFAULT_DPI = 300
 DEFAULT_FORMAT = 'png'
 
+# 字体名称中表示支持中文的关键词，编译为一个正则表达式，每个名称只需匹配一次
+CJK_FONT_NAME_PATTERN = re.compile('Hei|Ming|Song|Yuan|Kai|Fang|Zhong|CN|GB|SC|TC|CJK')
+
+# 字体文件名（小写）中表示中文字体的关键词
+CJK_FONT_FILE_PATTERN = re.compile('chinese|cjk|sc|cn|zh|hei|kai|ming|song')
+
+@functools.lru_cache(maxsize=1)
+def _installed_font_names():
+    """matplotlib已注册字体的名称集合（只枚举一次）"""
+    import matplotlib.font_manager as fm
+    return frozenset(f.name for f in fm.fontManager.ttflist)
+
+@functools.lru_cache(maxsize=1)
+def _system_font_files():
+    """系统字体文件路径列表（只扫描一次字体目录）"""
+    import matplotlib.font_manager as fm
+    return tuple(fm.findSystemFonts())
+
+@functools.lru_cache(maxsize=1)
+def _fc_list_chinese_fonts():
+    """用fc-list命令找出系统中所有支持中文的字体名称（只执行一次命令）"""
+    found_fonts = []
+    try:
+        result = subprocess.run(['fc-list', ':lang=zh', 'family'], 
+                             stdout=subprocess.PIPE, 
+                             stderr=subprocess.PIPE, 
+                             universal_newlines=True)
+        if result.returncode == 0:
+            # 解析输出并提取字体名称
+            for line in result.stdout.split('\n'):
+                if line.strip():
+                    font_names = [name.strip() for name in line.split(',')]
+                    for font_name in font_names:
+                        if font_name and font_name not in found_fonts:
+                            found_fonts.append(font_name)
+    except Exception:
+        pass
+    return tuple(found_fonts)
+
 # 查找系统中可用的字体
 def find_available_fonts():
     """查找系统中可用的字体，优先选择中文字体"""
+    import matplotlib.font_manager as fm
+    
     available_fonts = []
     chinese_fonts = [
         # 中文字体常见名称
@@ -97,11 +141,10 @@ def find_available_fonts():
     ]
     
     # 查找系统中已安装的字体
-    system_fonts = [f.name for f in fm.fontManager.ttflist]
+    system_fonts = _installed_font_names()
     
     # 尝试命令获取系统中的中文字体
     try:
-        import subprocess
         result = subprocess.run(['fc-list', ':lang=zh'], capture_output=True, text=True)
         if result.returncode == 0:
             # 解析输出中的字体名称
@@ -117,17 +160,14 @@ def find_available_fonts():
     except Exception:
         pass
     
-    # 检查系统中是否有中文字体文件
-    for font_file in fm.findSystemFonts():
-        try:
-            font = fm.FontProperties(fname=font_file)
-            font_name = font.get_name()
-            # 检查字体是否支持中文
-            if any(chinese_font in font_name for chinese_font in ['Hei', 'Ming', 'Song', 'Yuan', 'Kai', 'Fang', 'Zhong', 'CN', 'GB', 'SC', 'TC', 'CJK']):
-                if font_name not in available_fonts:
-                    available_fonts.append(font_name)
-        except:
-            pass
+    # 检查系统中是否有中文字体文件（直接使用matplotlib字体列表中已解析的名称，不再逐个打开字体文件解析）
+    system_font_files = set(_system_font_files())
+    for font_entry in fm.fontManager.ttflist:
+        font_name = font_entry.name
+        # 检查字体是否支持中文
+        if font_entry.fname in system_font_files and CJK_FONT_NAME_PATTERN.search(font_name):
+            if font_name not in available_fonts:
+                available_fonts.append(font_name)
     
     # 优先选择已知的中文字体
     for font in chinese_fonts:
@@ -154,6 +194,71 @@ def find_available_fonts():
     
     return available_fonts
 
+# 字体检测结果的缓存文件名（与matplotlib自身的字体列表缓存放在同一目录，缓存格式变化时修改版本号）
+FONT_CACHE_NAME = 'pollen-fontlist-v1.json'
+
+def _load_or_build_font_cache():
+    """
+    读取缓存的字体检测结果，缓存不存在或已失效时重新检测并写入缓存
+    
+    缓存以matplotlib版本、平台和系统字体文件列表为校验键，安装或删除字体后自动重新检测；
+    命中缓存时跳过fc-list命令和逐个字体文件的解析
+    """
+    import matplotlib
+    
+    font_cache_path = os.path.join(matplotlib.get_cachedir(), FONT_CACHE_NAME)
+    cache_key = [matplotlib.__version__, platform.platform(), sorted(_system_font_files())]
+    try:
+        with open(font_cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == cache_key:
+            return cached['fonts']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    
+    available_fonts = find_available_fonts()
+    
+    # 先写临时文件再替换，避免并发导入时读到不完整的缓存
+    try:
+        tmp_path = f"{font_cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': cache_key, 'fonts': available_fonts}, f, ensure_ascii=False)
+        os.replace(tmp_path, font_cache_path)
+    except OSError:
+        pass
+    
+    return available_fonts
+
+# 项目自带字体目录：放入中文字体文件（如NotoSansSC-Regular.otf）后直接注册使用，不再扫描系统字体
+BUNDLED_FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'fonts')
+
+@functools.lru_cache(maxsize=1)
+def _register_bundled_fonts():
+    """
+    将项目fonts目录中的字体文件注册到matplotlib（每个进程只注册一次）
+    
+    返回:
+        tuple: 注册成功的字体名称，目录不存在或没有可用字体文件时为空
+    """
+    if not os.path.isdir(BUNDLED_FONT_DIR):
+        return ()
+    
+    import matplotlib.font_manager as fm
+    
+    font_names = []
+    for file_name in sorted(os.listdir(BUNDLED_FONT_DIR)):
+        if not file_name.lower().endswith(('.ttf', '.otf', '.ttc')):
+            continue
+        font_path = os.path.join(BUNDLED_FONT_DIR, file_name)
+        try:
+            fm.fontManager.addfont(font_path)
+            font_name = fm.FontProperties(fname=font_path).get_name()
+        except Exception:
+            continue
+        if font_name not in font_names:
+            font_names.append(font_name)
+    return tuple(font_names)
+
 def get_system_fonts():
     """获取系统推荐字体"""
     system = platform.system()
@@ -167,17 +272,63 @@ def get_system_fonts():
         return ['WenQuanYi Micro Hei', 'Noto Sans CJK SC', 'Droid Sans Fallback', 
                 'Source Han Sans CN', 'Ubuntu', 'Liberation Sans']
 
-# 自动检测可用字体
-AVAILABLE_FONTS = find_available_fonts()
-PRIMARY_FONT = AVAILABLE_FONTS[0] if AVAILABLE_FONTS else 'sans-serif'
+# 进程池工作进程从父进程接收的字体检测结果，由init_font_worker设置
+_inherited_fonts = None
+
+def _font_state_key():
+    """字体检测结果的校验键（matplotlib版本和平台），与磁盘缓存的校验方式一致"""
+    import matplotlib
+    return [matplotlib.__version__, platform.platform()]
+
+def font_worker_state():
+    """
+    获取可传给进程池工作进程的字体检测结果
+    
+    返回:
+        dict: 校验键和可用字体列表，作为init_font_worker的参数
+    """
+    return {'key': _font_state_key(), 'fonts': list(_detected_fonts()['AVAILABLE_FONTS'])}
+
+def init_font_worker(font_state):
+    """
+    进程池初始化函数：校验键与当前进程一致时复用父进程的字体检测结果，工作进程无需再扫描系统字体
+    
+    参数:
+        font_state (dict): font_worker_state()的返回值
+    """
+    global _inherited_fonts
+    if font_state and font_state.get('key') == _font_state_key():
+        _inherited_fonts = list(font_state['fonts'])
+
+@functools.lru_cache(maxsize=1)
+def _detected_fonts():
+    """自动检测可用字体（首次访问字体常量时才检测，只导入配置的模块不必加载matplotlib）"""
+    # 设置POLLEN_SKIP_FONT_DETECT环境变量时跳过检测直接使用默认字体（用于CI和无界面部署）
+    if os.environ.get('POLLEN_SKIP_FONT_DETECT'):
+        available_fonts = ['sans-serif']
+    elif _inherited_fonts is not None:
+        # 进程池工作进程直接复用父进程已校验过的检测结果
+        available_fonts = list(_inherited_fonts)
+    else:
+        # 项目自带字体优先，存在时跳过系统字体扫描和fc-list命令
+        available_fonts = list(_register_bundled_fonts()) or _load_or_build_font_cache()
+    primary_font = available_fonts[0] if available_fonts else 'sans-serif'
+    
+    # 尝试检测中文字体 - 更新支持的中文字体列表
+    cjk_font = next((font for font in available_fonts[1:] if font in {
+        'SimHei', 'Microsoft YaHei', 'SimSun', 'WenQuanYi Micro Hei', 'Noto Sans CJK SC',
+        'Source Han Sans CN', 'Droid Sans Fallback', 'PingFang SC', 'STHeiti',
+        '文泉驿微米黑', '文泉驿正黑', 'Noto Serif CJK SC', 'AR PL UKai CN', 'AR PL UMing CN',
+        'WenQuanYi Zen Hei', 'WenQuanYi Zen Hei Sharp', 'Droid Sans Fallback'
+    }), None)
+    
+    return {'AVAILABLE_FONTS': available_fonts, 'PRIMARY_FONT': primary_font, 'CJK_FONT': cjk_font}
 
-# 尝试检测中文字体 - 更新支持的中文字体列表
-CJK_FONT = next((font for font in AVAILABLE_FONTS[1:] if font in [
-    'SimHei', 'Microsoft YaHei', 'SimSun', 'WenQuanYi Micro Hei', 'Noto Sans CJK SC',
-    'Source Han Sans CN', 'Droid Sans Fallback', 'PingFang SC', 'STHeiti',
-    '文泉驿微米黑', '文泉驿正黑', 'Noto Serif CJK SC', 'AR PL UKai CN', 'AR PL UMing CN',
-    'WenQuanYi Zen Hei', 'WenQuanYi Zen Hei Sharp', 'Droid Sans Fallback'
-]), None)
+def __getattr__(name):
+    """模块级字体常量AVAILABLE_FONTS、PRIMARY_FONT和CJK_FONT在首次访问时才检测"""
+    if name in ('AVAILABLE_FONTS', 'PRIMARY_FONT', 'CJK_FONT'):
+        return _detected_fonts()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 配置字体回退设置
 def configure_matplotlib_fonts():
@@ -192,9 +343,6 @@ def configure_matplotlib_fonts():
     """
     import matplotlib
     import matplotlib.font_manager as fm
-    import platform
-    import subprocess
-    import warnings
     
     # 抑制所有警告
     warnings.filterwarnings("ignore")
@@ -205,6 +353,15 @@ def configure_matplotlib_fonts():
         matplotlib.rcParams['pdf.fonttype'] = 42
         matplotlib.rcParams['ps.fonttype'] = 42
         
+        # 项目fonts目录中有自带字体时直接使用，不再检查系统字体
+        bundled_fonts = list(_register_bundled_fonts())
+        if bundled_fonts:
+            matplotlib.rcParams['font.family'] = 'sans-serif'
+            for family in ['sans-serif', 'serif', 'monospace']:
+                current_fonts = matplotlib.rcParams.get(f'font.{family}', [])
+                matplotlib.rcParams[f'font.{family}'] = bundled_fonts + [font for font in current_fonts if font not in bundled_fonts]
+            return True
+        
         # 尝试找到一个可用的中文字体
         chinese_font_found = False
         
@@ -222,7 +379,7 @@ def configure_matplotlib_fonts():
         system_fonts = []
         try:
             # 获取系统中的所有字体家族名称
-            system_fonts = set([f.name for f in fm.fontManager.ttflist])
+            system_fonts = _installed_font_names()
         except Exception:
             pass
         
@@ -230,25 +387,11 @@ def configure_matplotlib_fonts():
         found_fonts = []
         system = platform.system()
         if system != 'Windows' and system != 'Darwin':
-            try:
-                # 尝试使用fc-list命令找出系统中所有支持中文的字体
-                result = subprocess.run(['fc-list', ':lang=zh', 'family'], 
-                                     stdout=subprocess.PIPE, 
-                                     stderr=subprocess.PIPE, 
-                                     universal_newlines=True)
-                if result.returncode == 0:
-                    # 解析输出并提取字体名称
-                    for line in result.stdout.split('\n'):
-                        if line.strip():
-                            font_names = [name.strip() for name in line.split(',')]
-                            for font_name in font_names:
-                                if font_name and font_name not in found_fonts:
-                                    found_fonts.append(font_name)
-            except Exception:
-                pass
+            # 尝试使用fc-list命令找出系统中所有支持中文的字体（结果已缓存，重复配置时不再启动子进程）
+            found_fonts = list(_fc_list_chinese_fonts())
         
         # 尝试直接按字体文件路径创建字体属性
-        font_files = fm.findSystemFonts()
+        font_files = _system_font_files()
         
         # 先检查是否有最常见的中文字体
         for font in linux_fonts:
@@ -268,7 +411,8 @@ def configure_matplotlib_fonts():
             matplotlib.rcParams['font.family'] = 'sans-serif'
             for family in ['sans-serif', 'serif', 'monospace']:
                 current_fonts = matplotlib.rcParams.get(f'font.{family}', [])
-                matplotlib.rcParams[f'font.{family}'] = found_fonts[:3] + current_fonts
+                # 去掉已存在的同名字体后再前置，重复调用时字体列表不会不断增长
+                matplotlib.rcParams[f'font.{family}'] = found_fonts[:3] + [font for font in current_fonts if font not in found_fonts[:3]]
         
         # 最后的后备方案：使用DejaVu Sans并设置font.family为sans-serif
         if not chinese_font_found:
@@ -288,7 +432,7 @@ def configure_matplotlib_fonts():
             chinese_font_files = []
             for font_file in font_files:
                 lower_name = font_file.lower()
-                if any(keyword in lower_name for keyword in ['chinese', 'cjk', 'sc', 'cn', 'zh', 'hei', 'kai', 'ming', 'song']):
+                if CJK_FONT_FILE_PATTERN.search(lower_name):
                     chinese_font_files.append(font_file)
             
             # 如果找到了中文字体文件，使用其中的前三个
@@ -352,8 +496,7 @@ def get_default_output_dir():
     output_dir = os.path.join(script_dir, 'output', 'visualization_output')
     
     # 确保目录存在
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
     return output_dir
 
@@ -364,8 +507,7 @@ def get_default_data_dir():
     data_dir = os.path.join(script_dir, 'data')
     
     # 确保目录存在
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
+    os.makedirs(data_dir, exist_ok=True)
     
     return data_dir
 
@@ -373,7 +515,7 @@ def get_default_data_dir():
 # 此文件包含了花粉数据可视化所需的配置信息，如颜色映射、标签等
 
 # 花粉等级对应的颜色映射
-LEVEL_COLORS = {
+LEVEL_COLORS = MappingProxyType({
     "未检测": "#999999",
     "很低": "#81CB31",
     "较低": "#A1FF3D",
@@ -382,19 +524,7 @@ LEVEL_COLORS = {
     "很高": "#FF2319",
     "极高": "#AD075D",
     "暂无": "#CCCCCC"
-}
-
-# 花粉等级对应的文字说明
-LEVEL_DESCRIPTIONS = {
-    "未检测": "无花粉",
-    "很低": "不易引发过敏反应",
-    "较低": "对极敏感人群可能引发过敏反应",
-    "偏高": "易引发过敏，加强防护，对症用药",
-    "较高": "易引发过敏，加强防护，规范用药",
-    "很高": "极易引发过敏，减少外出，持续规范用药",
-    "极高": "极易引发过敏，建议足不出户，规范用药",
-    "暂无": "暂无数据"
-}
+})
 
 # 花粉季节周期（月份）
 # 这些信息用于展示或告知用户花粉高发季节
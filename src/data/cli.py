@@ -6,7 +6,6 @@
 提供命令行接口，用于获取和处理花粉数据
 """
 
-import argparse
 from datetime import datetime, timedelta
 import os
 import sys
@@ -32,6 +31,9 @@ def print_success(text):
 
 def parse_arguments():
     """解析命令行参数"""
+    # argparse只在解析命令行时才需要，作为模块导入时不加载
+    import argparse
+    
     parser = argparse.ArgumentParser(description="花粉数据爬虫工具")
     
     # 基本参数
@@ -40,7 +42,7 @@ def parse_arguments():
     parser.add_argument("--start", "-s", help="固定日期模式下，开始日期 (YYYY-MM-DD)")
     parser.add_argument("--end", "-e", help="固定日期模式下，结束日期 (YYYY-MM-DD)")
     parser.add_argument("--delay", type=int, help="请求之间的延迟时间（秒）")
-    parser.add_argument("--format", "-f", choices=["csv", "excel"], help="输出文件格式")
+    parser.add_argument("--format", "-f", choices=["csv", "excel", "parquet"], help="输出文件格式（parquet需要安装pyarrow）")
     parser.add_argument("--prefix", "-p", help="输出文件名前缀")
     
     # 示例数据生成
@@ -119,6 +121,8 @@ def scrape_data(config):
                 df = pd.read_csv(file_path)
             elif file_path.endswith('.xlsx'):
                 df = pd.read_excel(file_path)
+            elif file_path.endswith('.parquet'):
+                df = pd.read_parquet(file_path)
             else:
                 continue
             
@@ -158,14 +162,11 @@ def scrape_data(config):
         print_success("数据处理完成")
         return
     
-    # 检查每个日期和城市的数据是否存在
-    missing_data = []
-    for date in date_range:
-        date_data = all_data_df[all_data_df['日期'] == date]
-        for city in city_names:
-            city_date_data = date_data[date_data['城市'] == city]
-            if len(city_date_data) == 0 or pd.isna(city_date_data['花粉等级']).all():
-                missing_data.append((date, city))
+    # 检查每个日期和城市的数据是否存在（一次遍历收集已有花粉等级的(日期, 城市)组合，不再逐日期逐城市筛选整张表）
+    valid_rows = all_data_df[all_data_df['花粉等级'].notna()]
+    existing_pairs = set(zip(valid_rows['日期'], valid_rows['城市']))
+    missing_data = [(date, city) for date in date_range for city in city_names
+                    if (date, city) not in existing_pairs]
     
     # 如果所有数据都存在，则不需要爬取
     if not missing_data:
@@ -175,11 +176,13 @@ def scrape_data(config):
         return
     
     # 打印缺失数据的信息
-    missing_dates = sorted(list(set([date for date, _ in missing_data])))
+    missing_cities_by_date = {}
+    for date, city in missing_data:
+        missing_cities_by_date.setdefault(date, []).append(city)
     print_header("检测到数据不完整")
     print(f"在数据文件中缺少以下日期的花粉等级数据:")
-    for date in missing_dates:
-        missing_cities_for_date = [city for d, city in missing_data if d == date]
+    for date in sorted(missing_cities_by_date):
+        missing_cities_for_date = missing_cities_by_date[date]
         print(f"  {date}: {len(missing_cities_for_date)}个城市缺少数据")
         if len(missing_cities_for_date) <= 10:  # 只显示少量城市时才列出城市名
             print(f"    缺少的城市: {', '.join(missing_cities_for_date)}")
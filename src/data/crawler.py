@@ -13,6 +13,41 @@ from datetime import datetime, timedelta
 
 from .constants import CITIES
 
+# orjson为可选依赖，不可用时退回标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 更全面的请求头，模拟浏览器访问
+request_headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
+    "Referer": "https://www.weather.com.cn/forecast/hf_index.shtml?id=101010100",
+    "Accept": "*/*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Host": "graph.weatherdt.com"
+}
+
+# 所有请求共用一个会话，逐个城市爬取时复用同一个keep-alive连接，不必每次重新建立TCP/TLS连接
+session = requests.Session()
+session.headers.update(request_headers)
+
+def parse_response_json(content):
+    """
+    解析响应内容（字节）为JSON
+    
+    响应内容不一定是标准的JSON格式，可能被括号包裹，解析失败时去掉括号再试一次
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    try:
+        return loads(content)
+    except json.JSONDecodeError:
+        if content.startswith(b"(") and content.endswith(b")"):
+            content = content[1:-1]  # 移除括号
+        return loads(content)
+
 def get_pollen_data(city_info, start_date, end_date, config, retry_count=0):
     """
     获取指定城市的花粉数据
@@ -36,41 +71,21 @@ def get_pollen_data(city_info, start_date, end_date, config, retry_count=0):
         "predictFlag": "true"
     }
     
-    # 更全面的请求头，模拟浏览器访问
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
-        "Referer": "https://www.weather.com.cn/forecast/hf_index.shtml?id=101010100",
-        "Accept": "*/*",
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Host": "graph.weatherdt.com"
-    }
-    
     try:
-        response = requests.get(
+        response = session.get(
             url, 
             params=params, 
-            headers=headers, 
             timeout=config["REQUEST_TIMEOUT"]
         )
         
         # 响应内容不是标准的JSON格式，需要处理
         if response.status_code == 200:
-            # 尝试直接解析为JSON
+            # 直接解析响应字节，无需先解码为文本
             try:
-                data = response.json()
-            except json.JSONDecodeError:
-                # 如果失败，尝试手动解析文本
-                text = response.text
-                if text.startswith("(") and text.endswith(")"):
-                    text = text[1:-1]  # 移除括号
-                
-                try:
-                    data = json.loads(text)
-                except json.JSONDecodeError as e:
-                    print(f"JSON解析错误: {str(e)}")
-                    return []
+                data = parse_response_json(response.content)
+            except json.JSONDecodeError as e:
+                print(f"JSON解析错误: {str(e)}")
+                return []
             
             # 根据实际返回数据结构调整 - 使用'dataList'字段而非'data'
             if "dataList" in data:
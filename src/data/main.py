@@ -91,7 +91,7 @@ def save_pollen_data(df, filename=None, format="csv", encoding="utf-8-sig"):
     参数:
     - df: 要保存的DataFrame
     - filename: 文件名，如果为None则使用默认格式
-    - format: 文件格式，"csv"或"excel"
+    - format: 文件格式，"csv"、"excel"或"parquet"（需要安装pyarrow）
     - encoding: 文件编码，默认为"utf-8-sig"
     
     返回:
@@ -7,6 +7,7 @@
 """
 
 import os
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import random
@@ -185,17 +186,15 @@ def process_pollen_data(raw_data):
     processed_df = processed_df[processed_df['城市'] != "nan"]
     processed_df = processed_df[processed_df['城市'] != "None"]
     
-    # 最后检查城市列，对于空值使用城市代码映射
-    for i, row in processed_df.iterrows():
-        if row['城市'] == "":
-            if '城市代码' in processed_df.columns and not pd.isna(row['城市代码']):
-                city_code = row['城市代码']
-                # 使用常量中的映射关系
-                from .constants import CITIES
-                for city in CITIES:
-                    if city['en'] == city_code:
-                        processed_df.loc[i, '城市'] = city['cn']
-                        break
+    # 最后检查城市列，对于空值使用城市代码映射（按字典一次映射整列，无需逐行遍历）
+    if '城市代码' in processed_df.columns:
+        empty_city = (processed_df['城市'] == "").to_numpy()
+        if empty_city.any():
+            # 使用常量中的映射关系（城市代码重复时取第一个）
+            from .constants import CITIES
+            code_to_name = {city['en']: city['cn'] for city in reversed(CITIES)}
+            mapped_names = processed_df.loc[empty_city, '城市代码'].map(code_to_name)
+            processed_df.loc[empty_city, '城市'] = mapped_names.fillna("")
     
     # 确保必需的列存在
     required_columns = ['日期', '城市', '花粉等级']
@@ -256,6 +255,11 @@ def save_data(df, config, city_name=None):
         filename = os.path.join(data_dir, f"{base_filename}.xlsx")
         print(f"保存Excel文件: {filename}")
         df.to_excel(filename, index=False, engine="openpyxl")
+    elif config["OUTPUT_FORMAT"].lower() == "parquet":
+        filename = os.path.join(data_dir, f"{base_filename}.parquet")
+        print(f"保存Parquet文件: {filename}")
+        # 列式存储，城市、等级等重复度很高的文本列按字典编码，读取时也无需逐行解析文本
+        df.to_parquet(filename, index=False)
     else:
         print(f"不支持的文件格式: {config['OUTPUT_FORMAT']}，将使用CSV格式")
         filename = os.path.join(data_dir, f"{base_filename}.csv")
@@ -283,37 +287,35 @@ def create_sample_data(num_cities=5, num_days=30):
     # 选择城市
     selected_cities = random.sample(CITIES, min(num_cities, len(CITIES)))
     
-    # 生成日期范围
+    # 生成日期范围（截止到今天的连续num_days天）
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=num_days-1)
-    
-    # 生成数据
-    data = []
-    for city in selected_cities:
-        current_date = start_date
-        while current_date <= end_date:
-            # 随机选择花粉等级
-            level_index = random.randint(0, len(POLLEN_LEVELS)-1)
-            level_info = POLLEN_LEVELS[level_index]
-            
-            # 生成随机指数 (0-100)
-            index_value = random.randint(0, 100)
-            
-            data.append({
-                '日期': current_date.strftime("%Y-%m-%d"),
-                '城市': city['cn'],
-                '城市ID': city['id'],
-                '城市代码': city['en'],
-                '花粉等级': level_info['level'],
-                '花粉指数': index_value,
-                '等级描述': level_info['message'],
-                '颜色代码': level_info['color']
-            })
-            
-            current_date += timedelta(days=1)
-    
-    # 转换为DataFrame
-    df = pd.DataFrame(data)
+    date_strings = pd.date_range(end=end_date, periods=num_days).strftime("%Y-%m-%d").tolist()
+    
+    # 一次性抽取所有记录的花粉等级和随机指数 (0-100)，按城市在外层、日期在内层排列；
+    # 生成器的种子取自random模块，调用方用random.seed()固定种子时结果仍可重复
+    rng = np.random.default_rng(random.getrandbits(64))
+    total = len(selected_cities) * len(date_strings)
+    level_indices = rng.integers(0, len(POLLEN_LEVELS), size=total)
+    index_values = rng.integers(0, 101, size=total)
+    
+    # 等级、描述和颜色组成一张结构化的等级表，按等级索引一次取出三列
+    level_table = np.array(
+        [(level_info['level'], level_info['message'], level_info['color']) for level_info in POLLEN_LEVELS],
+        dtype=[('level', object), ('message', object), ('color', object)]
+    )
+    level_rows = level_table[level_indices]
+    
+    # 按列生成数据
+    df = pd.DataFrame({
+        '日期': date_strings * len(selected_cities),
+        '城市': np.repeat([city['cn'] for city in selected_cities], len(date_strings)),
+        '城市ID': np.repeat([city['id'] for city in selected_cities], len(date_strings)),
+        '城市代码': np.repeat([city['en'] for city in selected_cities], len(date_strings)),
+        '花粉等级': level_rows['level'],
+        '花粉指数': index_values,
+        '等级描述': level_rows['message'],
+        '颜色代码': level_rows['color']
+    })
     
     print(f"已生成 {len(df)} 条示例数据记录")
     return df
@@ -12,7 +12,7 @@ import datetime
 
 def load_data(file_path):
     """
-    加载花粉数据文件
+    加载花粉数据文件（CSV或Parquet）
     
     参数:
         file_path (str): 数据文件的路径
@@ -24,22 +24,32 @@ def load_data(file_path):
         raise FileNotFoundError(f"数据文件不存在: {file_path}")
     
     try:
-        # 尝试加载CSV文件
-        df = pd.read_csv(file_path)
-        
-        # 检查是否包含必要的列
         required_columns = ['日期', '城市']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        
+        # Parquet文件自带列类型，直接按列读取
+        if os.path.splitext(file_path)[1].lower() == '.parquet':
+            df = pd.read_parquet(file_path)
+            missing_columns = [col for col in required_columns if col not in df.columns]
+            if missing_columns:
+                raise ValueError(f"数据文件缺少必要的列: {', '.join(missing_columns)}")
+            if not pd.api.types.is_datetime64_any_dtype(df['日期']):
+                df['日期'] = pd.to_datetime(df['日期'])
+            return df
+        
+        # 只读取表头检查必要的列，避免解析完整个文件后才发现缺列
+        available_columns = pd.read_csv(file_path, nrows=0).columns
+        missing_columns = [col for col in required_columns if col not in available_columns]
         
         if missing_columns:
             raise ValueError(f"数据文件缺少必要的列: {', '.join(missing_columns)}")
         
-        # 处理日期列
-        if '日期' in df.columns:
-            # 确保日期列是datetime类型
-            df['日期'] = pd.to_datetime(df['日期'])
-        
-        return df
+        # 读取时直接解析日期列；城市名称重复度很高，使用分类类型，每行只存储整数编码
+        return pd.read_csv(
+            file_path,
+            dtype={'城市': 'category'},
+            parse_dates=['日期'],
+            cache_dates=True
+        )
         
     except Exception as e:
         raise Exception(f"加载数据文件时出错: {str(e)}")
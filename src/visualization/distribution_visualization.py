@@ -60,13 +60,17 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
         output_dir = get_default_output_dir()
     
     # 确保输出目录存在
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
     # 获取唯一城市列表
     cities = df['城市'].unique().tolist()
     city_count = len(cities)
     
+    # 没有城市数据时直接返回，避免生成空白图表
+    if city_count == 0:
+        print("警告: 没有城市数据，无法生成分布图")
+        return None
+    
     # 如果数据包含日期列，获取最新日期
     latest_date = None
     if '日期' in df.columns:
@@ -90,34 +94,13 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
         # 对于每个城市，计算每个等级的花粉数据数量
         city_level_counts = df.groupby(['城市', '花粉等级']).size().unstack(fill_value=0)
         
-        # 如果有多个日期，我们取每个城市最近一天的数据
-        if '日期' in df.columns and len(df['日期'].unique()) > 1:
-            latest_data = df.loc[df.groupby('城市')['日期'].idxmax()]
-            city_levels = latest_data.set_index('城市')['花粉等级']
-            
-            # 创建一个新的DataFrame仅包含最新数据
-            city_level_data = pd.DataFrame(index=cities)
-            for city in cities:
-                if city in city_levels.index:
-                    city_level_data.loc[city, '花粉等级'] = city_levels[city]
-                else:
-                    city_level_data.loc[city, '花粉等级'] = '未知'
-        else:
-            # 计算每个城市的平均花粉等级
-            city_level_data = df.groupby('城市')['花粉等级'].agg(lambda x: x.value_counts().index[0])
-            city_level_data = pd.DataFrame(city_level_data)
-        
         # 转换花粉等级为数值进行排序
-        level_order = ['未检测', '很低', '较低', '偏高', '较高', '很高', '极高']
-        
-        # 处理可能出现的未知等级
-        for level in df['花粉等级'].unique():
-            if level not in level_order and level != '暂无':
-                level_order.append(level)
+        base_levels = ['未检测', '很低', '较低', '偏高', '较高', '很高', '极高']
+        all_levels = pd.Index(df['花粉等级'].dropna().unique())
         
-        # 将'暂无'放在最后
-        if '暂无' in df['花粉等级'].unique():
-            level_order.append('暂无')
+        # 处理可能出现的未知等级，并将'暂无'放在最后
+        extra_levels = all_levels.difference(base_levels + ['暂无'], sort=False).tolist()
+        level_order = base_levels + extra_levels + (['暂无'] if '暂无' in all_levels else [])
         
         # 准备颜色映射
         colors = {}
@@ -128,90 +111,69 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
                 # 对于未知等级使用灰色
                 colors[level] = '#CCCCCC'
         
-        # 计算每个城市的等级分布百分比
-        if city_count > 0:
-            level_percentages = {}
-            for city in cities:
-                city_data = df[df['城市'] == city]
-                if not city_data.empty:
-                    level_counts = city_data['花粉等级'].value_counts()
-                    total = level_counts.sum()
-                    level_percentages[city] = {level: count/total*100 for level, count in level_counts.items()}
-            
-            # 创建堆叠条形图
-            fig, ax = plt.subplots(figsize=(fig_width, fig_height))
-            
-            # 设置背景
-            fig.patch.set_facecolor('#f8f9fa')
-            ax.set_facecolor('#ffffff')
-            
-            # 计算每个城市每个等级的百分比
-            levels_data = {}
-            for level in level_order:
-                levels_data[level] = []
-                for city in cities:
-                    if city in level_percentages and level in level_percentages[city]:
-                        levels_data[level].append(level_percentages[city][level])
-                    else:
-                        levels_data[level].append(0)
-            
-            # 绘制堆叠条形图
-            bottom = np.zeros(len(cities))
-            for level in level_order:
-                if level in levels_data:
-                    ax.barh(cities, levels_data[level], left=bottom, color=colors[level], label=level)
-                    bottom += np.array(levels_data[level])
-            
-            # 设置图例
-            legend = ax.legend(title="花粉等级", loc='lower right', fontsize=CHART_CONFIG['legend_size'])
-            
-            # 为图例设置字体
-            if font_prop and legend:
-                for text in legend.get_texts():
-                    text.set_fontproperties(font_prop)
-                legend.get_title().set_fontproperties(font_prop)
-            
-            # 设置标题和标签
-            if latest_date:
-                title_text = f"城市花粉等级分布 ({latest_date})"
-            else:
-                title_text = "城市花粉等级分布"
-                
-            if font_prop:
-                ax.set_title(title_text, fontsize=CHART_CONFIG['title_size'], pad=20, fontproperties=font_prop)
-                ax.set_xlabel("百分比 (%)", fontsize=CHART_CONFIG['axes_size'], fontproperties=font_prop)
-                ax.set_ylabel("城市", fontsize=CHART_CONFIG['axes_size'], fontproperties=font_prop)
-            else:
-                ax.set_title(title_text, fontsize=CHART_CONFIG['title_size'], pad=20)
-                ax.set_xlabel("百分比 (%)", fontsize=CHART_CONFIG['axes_size'])
-                ax.set_ylabel("城市", fontsize=CHART_CONFIG['axes_size'])
-            
-            # 添加网格线
-            ax.grid(True, axis='x', linestyle='--', alpha=0.7)
-            
-            # 设置百分比刻度
-            ax.set_xlim(0, 100)
-            
-            # 设置刻度标签字体大小并确保使用中文字体
-            ax.tick_params(axis='both', labelsize=CHART_CONFIG['tick_size'])
-            
-            # 确保所有标签使用正确的字体
-            if font_prop:
-                for label in ax.get_xticklabels() + ax.get_yticklabels():
-                    label.set_fontproperties(font_prop)
-            
-            # 添加百分比标签
-            for i, city in enumerate(cities):
-                if font_prop:
-                    ax.text(101, i, f"{city}", va='center', 
-                           fontsize=CHART_CONFIG['tick_size'],
-                           fontproperties=font_prop)
-                else:
-                    ax.text(101, i, f"{city}", va='center', 
-                           fontsize=CHART_CONFIG['tick_size'])
-            
-            plt.tight_layout()
+        # 创建堆叠条形图
+        fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+        
+        # 设置背景
+        fig.patch.set_facecolor('#f8f9fa')
+        ax.set_facecolor('#ffffff')
+        
+        # 由分组计数直接计算每个城市每个等级的百分比（行: 城市，列: 等级），无需逐个城市筛选数据
+        level_counts = city_level_counts.reindex(index=cities, columns=level_order, fill_value=0)
+        totals = level_counts.sum(axis=1)
+        pct = level_counts.div(totals.where(totals > 0), axis=0).mul(100).fillna(0).to_numpy(dtype=float)
+        
+        # 一次性计算每一层的起始位置
+        left = np.concatenate([np.zeros((len(cities), 1)), np.cumsum(pct[:, :-1], axis=1)], axis=1)
+        
+        # 绘制堆叠条形图
+        for j, level in enumerate(level_order):
+            ax.barh(cities, pct[:, j], left=left[:, j], color=colors[level], label=level)
+        
+        # 设置图例
+        legend = ax.legend(title="花粉等级", loc='lower right', fontsize=CHART_CONFIG['legend_size'])
+        
+        # 为图例设置字体
+        if font_prop and legend:
+            for text in legend.get_texts():
+                text.set_fontproperties(font_prop)
+            legend.get_title().set_fontproperties(font_prop)
+        
+        # 设置标题和标签
+        if latest_date:
+            title_text = f"城市花粉等级分布 ({latest_date})"
+        else:
+            title_text = "城市花粉等级分布"
             
+        if font_prop:
+            ax.set_title(title_text, fontsize=CHART_CONFIG['title_size'], pad=20, fontproperties=font_prop)
+            ax.set_xlabel("百分比 (%)", fontsize=CHART_CONFIG['axes_size'], fontproperties=font_prop)
+            ax.set_ylabel("城市", fontsize=CHART_CONFIG['axes_size'], fontproperties=font_prop)
+        else:
+            ax.set_title(title_text, fontsize=CHART_CONFIG['title_size'], pad=20)
+            ax.set_xlabel("百分比 (%)", fontsize=CHART_CONFIG['axes_size'])
+            ax.set_ylabel("城市", fontsize=CHART_CONFIG['axes_size'])
+        
+        # 添加网格线
+        ax.grid(True, axis='x', linestyle='--', alpha=0.7)
+        
+        # 设置百分比刻度
+        ax.set_xlim(0, 100)
+        
+        # 使用y轴刻度标签显示城市名称
+        ax.set_yticks(range(len(cities)))
+        ax.set_yticklabels(cities)
+        
+        # 设置刻度标签字体大小并确保使用中文字体
+        ax.tick_params(axis='both', labelsize=CHART_CONFIG['tick_size'])
+        
+        # 确保所有标签使用正确的字体
+        if font_prop:
+            for label in ax.get_xticklabels() + ax.get_yticklabels():
+                label.set_fontproperties(font_prop)
+        
+        plt.tight_layout()
+        
     else:
         # 使用花粉指数数值数据
         # 检查是否存在'花粉指数'列，如果没有则尝试使用其他列
@@ -253,7 +215,7 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
         
         # 创建水平条形图
         fig, ax = plt.subplots(figsize=(fig_width, fig_height))
-        ax.barh(city_means.index, city_means.values, color=colors)
+        bars = ax.barh(city_means.index, city_means.values, color=colors)
         
         # 设置图表背景
         fig.patch.set_facecolor('#f8f9fa')
@@ -280,14 +242,13 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
                 label.set_fontproperties(font_prop)
         
         # 添加数值标签
-        for i, v in enumerate(city_means.values):
-            if font_prop:
-                ax.text(v + 1, i, f"{v:.1f}", va='center', 
-                       fontsize=CHART_CONFIG['annotation_size'],
-                       fontproperties=font_prop)
-            else:
-                ax.text(v + 1, i, f"{v:.1f}", va='center', 
-                       fontsize=CHART_CONFIG['annotation_size'])
+        if font_prop:
+            ax.bar_label(bars, fmt='%.1f', padding=3,
+                         fontsize=CHART_CONFIG['annotation_size'],
+                         fontproperties=font_prop)
+        else:
+            ax.bar_label(bars, fmt='%.1f', padding=3,
+                         fontsize=CHART_CONFIG['annotation_size'])
         
         # 添加网格线
         ax.grid(True, axis='x', linestyle='--', alpha=0.7)
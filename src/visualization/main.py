@@ -7,6 +7,10 @@
 """
 
 import os
+import glob
+import hashlib
+import tempfile
+import matplotlib
 import pandas as pd
 import warnings
 
@@ -23,9 +27,179 @@ from .utils import find_data_files, display_available_data_files, ensure_output_
 from ..config.visualization_config import (
     configure_matplotlib_fonts, 
     get_default_data_dir,
-    get_default_output_dir
+    get_default_output_dir,
+    CHART_CONFIG
 )
 
+def _cache_key(data_file, cities=None, start_date=None, end_date=None):
+    """
+    根据数据文件的修改时间和筛选参数生成缓存键
+    
+    参数:
+        data_file (str): 数据文件路径
+        cities (list): 城市列表
+        start_date (str): 开始日期
+        end_date (str): 结束日期
+        
+    返回:
+        str: 12位缓存键
+    """
+    stat = os.stat(data_file)
+    h = hashlib.sha1()
+    h.update(f"{os.path.abspath(data_file)}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    h.update(repr((tuple(cities or []), str(start_date), str(end_date))).encode())
+    return h.hexdigest()[:12]
+
+def _chart_cache_key(data_file, cities=None, start_date=None, end_date=None):
+    """
+    生成图表缓存键：在数据缓存键的基础上加入渲染设置（图表配置和当前字体），配置变化后不再使用旧图表
+    
+    参数:
+        data_file (str): 数据文件路径
+        cities (list): 城市列表
+        start_date (str): 开始日期
+        end_date (str): 结束日期
+        
+    返回:
+        str: 12位缓存键
+    """
+    h = hashlib.sha1(_cache_key(data_file, cities, start_date, end_date).encode())
+    h.update(repr(sorted(CHART_CONFIG.items())).encode())
+    h.update(repr((matplotlib.rcParams['font.family'], matplotlib.rcParams['font.sans-serif'])).encode())
+    return h.hexdigest()[:12]
+
+# 每类图表最多保留的缓存文件数（按修改时间保留最近使用的文件）
+MAX_CACHED_CHARTS = 20
+
+def _prune_cached_outputs(output_dir, prefix, key):
+    """
+    清理同类图表的缓存文件，只保留最近使用的MAX_CACHED_CHARTS份，当前图表始终保留
+    
+    参数:
+        output_dir (str): 输出目录
+        prefix (str): 图表文件名前缀
+        key (str): 当前缓存键
+    """
+    current_path = os.path.join(output_dir, f"{prefix}_key_{key}.{CHART_CONFIG['format']}")
+    cached_paths = []
+    for path in glob.glob(os.path.join(glob.escape(output_dir), f"{prefix}_key_*.{CHART_CONFIG['format']}")):
+        if path == current_path:
+            continue
+        try:
+            cached_paths.append((os.path.getmtime(path), path))
+        except OSError:
+            pass
+    
+    # 按修改时间从新到旧排序，超出数量上限（当前图表占一个名额）的旧文件删除
+    cached_paths.sort(reverse=True)
+    for _, old_path in cached_paths[MAX_CACHED_CHARTS - 1:]:
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass
+
+def _find_cached_output(output_dir, prefix, key):
+    """
+    查找与缓存键对应的已生成图表
+    
+    参数:
+        output_dir (str): 输出目录
+        prefix (str): 图表文件名前缀
+        key (str): 缓存键
+        
+    返回:
+        str: 已存在的图表路径，未命中则返回None
+    """
+    cached_path = os.path.join(output_dir, f"{prefix}_key_{key}.{CHART_CONFIG['format']}")
+    try:
+        # 命中时更新修改时间，清理缓存时按最近使用保留
+        os.utime(cached_path)
+    except OSError:
+        return None
+    return cached_path
+
+def _read_cities_only(data_file):
+    """
+    只读取数据文件中的城市列
+    
+    参数:
+        data_file (str): 数据文件路径
+        
+    返回:
+        pandas.Series: 城市列数据
+    """
+    ext = os.path.splitext(data_file)[1].lower()
+    if ext in ('.xlsx', '.xls'):
+        return pd.read_excel(data_file, usecols=['城市'])['城市']
+    if ext == '.parquet':
+        return pd.read_parquet(data_file, columns=['城市'])['城市']
+    return pd.read_csv(data_file, usecols=['城市'])['城市']
+
+# 准备好的数据缓存文件名（输出目录中只保留一份，缓存键与数据一起保存，键变化时覆盖）
+PREPARED_CACHE_NAME = '.prepared.pkl'
+
+def _write_atomic(path, write):
+    """
+    先写入同目录下的临时文件再替换目标文件，避免其他进程或线程读到不完整的文件
+    
+    参数:
+        path (str): 目标文件路径
+        write (callable): 接收临时文件路径并写入内容的函数
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _load_prepared_data(data_file, output_dir, cities=None, start_date=None, end_date=None):
+    """
+    加载、筛选并准备可视化数据，结果缓存到输出目录，缓存键未变化时直接读取
+    
+    参数:
+        data_file (str): 数据文件路径
+        output_dir (str): 输出目录（缓存文件保存位置）
+        cities (list): 城市列表
+        start_date (str): 开始日期
+        end_date (str): 结束日期
+        
+    返回:
+        pandas.DataFrame: 准备好的可视化数据
+    """
+    # 缓存键包含数据文件的修改时间，源文件变化后自动失效
+    key = _cache_key(data_file, cities, start_date, end_date)
+    prepared_cache = os.path.join(output_dir, PREPARED_CACHE_NAME)
+    
+    # 缓存文件保存(缓存键, 数据)，键与数据在同一个文件中，只有键一致时才使用其中的数据
+    if os.path.exists(prepared_cache):
+        try:
+            cached_key, cached_df = pd.read_pickle(prepared_cache)
+            if cached_key == key:
+                return cached_df
+        except Exception as e:
+            print(f"读取数据缓存失败，将重新处理数据: {e}")
+    
+    # 加载数据
+    df = load_data(data_file)
+    
+    # 筛选数据
+    filtered_df = filter_data(df, cities, start_date, end_date)
+    
+    # 准备数据
+    viz_df = prepare_data_for_visualization(filtered_df)
+    
+    # 保存缓存（pickle保留日期、数值和分类等列类型，读取时无需重新解析）；
+    # 键和数据一次写入、一次替换，并发写入时不会出现键与数据不匹配
+    try:
+        _write_atomic(prepared_cache, lambda path: pd.to_pickle((key, viz_df), path))
+    except Exception as e:
+        print(f"保存数据缓存失败: {e}")
+    
+    return viz_df
+
 def generate_trend_visualization(data_file=None, cities=None, start_date=None, end_date=None, 
                                 output_dir=None, filename=None):
     """
@@ -52,17 +226,25 @@ def generate_trend_visualization(data_file=None, cities=None, start_date=None, e
             raise FileNotFoundError("找不到数据文件，请提供数据文件路径")
         data_file = data_files[0]
     
-    # 加载数据
-    df = load_data(data_file)
-    
-    # 筛选数据
-    filtered_df = filter_data(df, cities, start_date, end_date)
+    # 数据文件和参数未变化时直接返回已生成的图表
+    output_dir = ensure_output_dir(output_dir)
+    key = None
+    if filename is None:
+        key = _chart_cache_key(data_file, cities, start_date, end_date)
+        cached_file = _find_cached_output(output_dir, "pollen_trends", key)
+        if cached_file:
+            print(f"使用缓存的花粉趋势图: {cached_file}")
+            return cached_file
+        filename = f"pollen_trends_key_{key}"
     
-    # 准备数据
-    viz_df = prepare_data_for_visualization(filtered_df)
+    # 加载、筛选并准备数据（命中缓存时直接读取）
+    viz_df = _load_prepared_data(data_file, output_dir, cities, start_date, end_date)
     
     # 生成趋势图
-    return visualize_pollen_trends(viz_df, output_dir, filename)
+    trend_file = visualize_pollen_trends(viz_df, output_dir, filename)
+    if trend_file and key:
+        _prune_cached_outputs(output_dir, "pollen_trends", key)
+    return trend_file
 
 def generate_distribution_visualization(data_file=None, cities=None, output_dir=None, filename=None):
     """
@@ -87,17 +269,25 @@ def generate_distribution_visualization(data_file=None, cities=None, output_dir=
             raise FileNotFoundError("找不到数据文件，请提供数据文件路径")
         data_file = data_files[0]
     
-    # 加载数据
-    df = load_data(data_file)
+    # 数据文件和参数未变化时直接返回已生成的图表
+    output_dir = ensure_output_dir(output_dir)
+    key = None
+    if filename is None:
+        key = _chart_cache_key(data_file, cities)
+        cached_file = _find_cached_output(output_dir, "pollen_distribution", key)
+        if cached_file:
+            print(f"使用缓存的花粉分布图: {cached_file}")
+            return cached_file
+        filename = f"pollen_distribution_key_{key}"
     
-    # 筛选数据
-    filtered_df = filter_data(df, cities)
-    
-    # 准备数据
-    viz_df = prepare_data_for_visualization(filtered_df)
+    # 加载、筛选并准备数据（命中缓存时直接读取）
+    viz_df = _load_prepared_data(data_file, output_dir, cities)
     
     # 生成分布图
-    return visualize_pollen_distribution(viz_df, output_dir, filename)
+    dist_file = visualize_pollen_distribution(viz_df, output_dir, filename)
+    if dist_file and key:
+        _prune_cached_outputs(output_dir, "pollen_distribution", key)
+    return dist_file
 
 def generate_all_visualizations(data_file=None, cities=None, start_date=None, end_date=None, output_dir=None):
     """
@@ -126,27 +316,31 @@ def generate_all_visualizations(data_file=None, cities=None, start_date=None, en
     # 确保输出目录存在
     output_dir = ensure_output_dir(output_dir)
     
-    # 加载数据
-    df = load_data(data_file)
-    
-    # 筛选数据
-    filtered_df = filter_data(df, cities, start_date, end_date)
+    # 数据文件和参数未变化时直接返回已生成的图表
+    key = _chart_cache_key(data_file, cities, start_date, end_date)
+    cached_trend = _find_cached_output(output_dir, "pollen_trends", key)
+    cached_dist = _find_cached_output(output_dir, "pollen_distribution", key)
+    if cached_trend and cached_dist:
+        print(f"使用缓存的可视化图表: {cached_trend}, {cached_dist}")
+        return [cached_trend, cached_dist]
     
-    # 准备数据
-    viz_df = prepare_data_for_visualization(filtered_df)
+    # 加载、筛选并准备数据（命中缓存时直接读取）
+    viz_df = _load_prepared_data(data_file, output_dir, cities, start_date, end_date)
     
     # 生成并保存图表
     output_files = []
     
     # 生成趋势图
-    trend_file = visualize_pollen_trends(viz_df, output_dir)
+    trend_file = cached_trend or visualize_pollen_trends(viz_df, output_dir, f"pollen_trends_key_{key}")
     if trend_file:
         output_files.append(trend_file)
+        _prune_cached_outputs(output_dir, "pollen_trends", key)
     
     # 生成分布图
-    dist_file = visualize_pollen_distribution(viz_df, output_dir)
+    dist_file = cached_dist or visualize_pollen_distribution(viz_df, output_dir, f"pollen_distribution_key_{key}")
     if dist_file:
         output_files.append(dist_file)
+        _prune_cached_outputs(output_dir, "pollen_distribution", key)
     
     return output_files
 
@@ -167,11 +361,8 @@ def get_available_cities(data_file=None):
             return []
         data_file = data_files[0]
     
-    # 加载数据
+    # 只读取城市列，跳过其他列的解析和日期转换
     try:
-        df = load_data(data_file)
-        if '城市' in df.columns:
-            return sorted(df['城市'].unique().tolist())
-        return []
+        return sorted(_read_cities_only(data_file).dropna().unique().tolist())
     except Exception:
         return [] 
\ No newline at end of file
@@ -9,10 +9,17 @@
 import os
 import sys
 import datetime
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+import matplotlib
+# 使用非交互式的Agg后端，避免加载GUI工具包
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+import matplotlib.dates as mdates
 import seaborn as sns
+from pandas.api.types import is_datetime64_any_dtype
 
 # 获取项目根目录
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -21,6 +28,8 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 sys.path.insert(0, PROJECT_ROOT)
 from src.config.visualization_config import (
     configure_matplotlib_fonts, 
+    font_worker_state,
+    init_font_worker,
     POLLEN_LEVEL_COLORS,
     POLLEN_LEVEL_NAMES,
     POLLEN_LEVEL_DESCRIPTIONS,
@@ -32,31 +41,71 @@ from src.config.visualization_config import (
 # 配置matplotlib中文字体
 configure_matplotlib_fonts()
 
-def load_data(file_path):
+# 花粉等级颜色查找表（按等级0-5索引），模块导入时计算一次
+_COLOR_LUT_HEX = [POLLEN_LEVEL_COLORS.get(str(level), '#999999') for level in range(6)]
+_COLOR_LUT_RGBA = np.array([mcolors.to_rgba(color) for color in _COLOR_LUT_HEX])
+
+# 热力图使用的6级离散色图，模块导入时创建一次（matplotlib 3.6以前没有colormaps注册表和resampled，使用get_cmap）
+try:
+    _LEVEL_CMAP = matplotlib.colormaps['YlOrRd'].resampled(6)
+except AttributeError:
+    _LEVEL_CMAP = matplotlib.cm.get_cmap('YlOrRd', 6)
+
+# 长折线分块绘制，降低Agg渲染大数据量时的开销
+plt.rcParams['agg.path.chunksize'] = 10000
+
+def _save_figure(output_path):
+    """
+    保存当前图表（边距已手动设置，不使用bbox_inches='tight'以免二次渲染）
+    
+    参数:
+        output_path (str): 输出文件路径
+    """
+    save_kwargs = {}
+    if CHART_CONFIG['format'] == 'png':
+        # PNG使用低压缩级别，以少量体积换取更快的编码速度
+        save_kwargs['pil_kwargs'] = {'compress_level': 1}
+    plt.savefig(output_path, dpi=CHART_CONFIG['dpi'], format=CHART_CONFIG['format'], **save_kwargs)
+
+def load_data(file_path, chunksize=None, usecols=None):
     """
     加载花粉数据文件
     
     参数:
         file_path (str): 数据文件的路径
+        chunksize (int): 分块读取的行数，为None时一次性读取整个文件
+        usecols (list): 需要读取的列，为None时读取所有列
         
     返回:
-        pandas.DataFrame: 加载的数据
+        pandas.DataFrame: 加载的数据；指定chunksize时返回逐块产生DataFrame的迭代器
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"数据文件不存在: {file_path}")
     
     try:
-        # 尝试加载CSV文件
-        df = pd.read_csv(file_path)
-        
-        # 检查必要的列是否存在
+        # 只读取表头检查必要的列，避免解析完整个文件后才发现缺列
         required_columns = ['日期', '城市', '花粉等级']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        available_columns = pd.read_csv(file_path, nrows=0).columns
+        if usecols is not None:
+            available_columns = [col for col in available_columns if col in usecols]
+        missing_columns = [col for col in required_columns if col not in available_columns]
         
         if missing_columns:
             raise ValueError(f"数据文件缺少必要的列: {', '.join(missing_columns)}")
         
-        return df
+        # 读取时直接指定列类型并解析日期
+        read_options = {
+            'usecols': usecols,
+            'dtype': {'城市': 'category'},
+            'parse_dates': ['日期'],
+            'cache_dates': True,
+        }
+        
+        # 分块读取大文件
+        if chunksize:
+            return pd.read_csv(file_path, chunksize=chunksize, **read_options)
+        
+        return pd.read_csv(file_path, **read_options)
     
     except Exception as e:
         print(f"加载数据文件出错: {e}")
@@ -75,21 +124,37 @@ def filter_data(df, cities=None, start_date=None, end_date=None):
     返回:
         pandas.DataFrame: 过滤后的数据
     """
-    filtered_df = df.copy()
+    # 先构建布尔掩码，最后一次性取出结果，避免复制整个数据框
+    mask = np.ones(len(df), dtype=bool)
     
     # 按城市过滤
     if cities:
-        filtered_df = filtered_df[filtered_df['城市'].isin(cities)]
-    
-    # 转换日期列为日期类型以便进行过滤
-    filtered_df['日期'] = pd.to_datetime(filtered_df['日期'])
-    
-    # 按日期范围过滤
-    if start_date:
-        filtered_df = filtered_df[filtered_df['日期'] >= pd.to_datetime(start_date)]
+        mask &= df['城市'].isin(cities).to_numpy()
     
-    if end_date:
-        filtered_df = filtered_df[filtered_df['日期'] <= pd.to_datetime(end_date)]
+    # 转换日期列为日期类型以便进行过滤（已解析过的日期不再重复转换）
+    dates = df['日期']
+    parsed_here = not is_datetime64_any_dtype(dates)
+    if parsed_here:
+        try:
+            dates = pd.to_datetime(dates, format='%Y-%m-%d', cache=True)
+        except (ValueError, TypeError):
+            # 日期不是YYYY-MM-DD格式（如带时间或使用斜杠分隔）时退回自动推断
+            dates = pd.to_datetime(dates, cache=True)
+    
+    # 按日期范围过滤，起止日期合并为一次向量化比较
+    start_ts = pd.Timestamp(start_date) if start_date else None
+    end_ts = pd.Timestamp(end_date) if end_date else None
+    
+    date_values = dates.to_numpy()
+    if start_ts is not None:
+        mask &= date_values >= start_ts.to_datetime64()
+    if end_ts is not None:
+        mask &= date_values <= end_ts.to_datetime64()
+    
+    filtered_df = df.loc[mask]
+    # 日期在本函数中解析时，用解析后的日期替换结果中的字符串日期列
+    if parsed_here:
+        filtered_df = filtered_df.assign(日期=date_values[mask])
     
     # 如果过滤后没有数据，给出警告
     if len(filtered_df) == 0:
@@ -107,25 +172,29 @@ def prepare_data_for_visualization(df):
     返回:
         pandas.DataFrame: 处理后的数据
     """
-    prepared_df = df.copy()
-    
+    # 只替换需要转换的列，其余列与原数据共享，不做整表复制
     # 确保日期列是日期类型
-    prepared_df['日期'] = pd.to_datetime(prepared_df['日期'])
+    converted_columns = {'日期': pd.to_datetime(df['日期'])}
     
     # 确保花粉等级是数值类型
-    if '花粉等级' in prepared_df.columns:
-        prepared_df['花粉等级'] = pd.to_numeric(prepared_df['花粉等级'], errors='coerce')
+    if '花粉等级' in df.columns:
+        converted_columns['花粉等级'] = pd.to_numeric(df['花粉等级'], errors='coerce', downcast='integer')
     
     # 确保花粉浓度是数值类型
-    if '花粉浓度' in prepared_df.columns:
-        prepared_df['花粉浓度'] = pd.to_numeric(prepared_df['花粉浓度'], errors='coerce')
+    if '花粉浓度' in df.columns:
+        converted_columns['花粉浓度'] = pd.to_numeric(df['花粉浓度'], errors='coerce')
+    
+    # 城市列使用分类类型，比较和分组基于整数编码而非字符串
+    converted_columns['城市'] = df['城市'].astype('category')
+    
+    prepared_df = df.assign(**converted_columns)
     
     # 按日期和城市排序
     prepared_df = prepared_df.sort_values(['城市', '日期'])
     
     return prepared_df
 
-def visualize_pollen_trends(df, output_dir=None, filename=None):
+def visualize_pollen_trends(df, output_dir=None, filename=None, fig=None):
     """
     生成花粉等级趋势图
     
@@ -133,6 +202,7 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
         df (pandas.DataFrame): 包含花粉数据的DataFrame
         output_dir (str): 输出目录路径
         filename (str): 输出文件名
+        fig (matplotlib.figure.Figure): 可复用的图表对象，为None时新建图表并在保存后关闭
         
     返回:
         str: 输出文件的完整路径
@@ -141,8 +211,7 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
     if output_dir is None:
         output_dir = get_default_output_dir()
     
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
     if filename is None:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -161,53 +230,47 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
     # 设置图表尺寸
     fig_width = CHART_CONFIG['figure_size'][0]
     fig_height = max(CHART_CONFIG['figure_size'][1], num_cities * 1.0)
-    plt.figure(figsize=(fig_width, fig_height))
-    
-    # 创建颜色映射
-    color_map = {}
-    for level, color in POLLEN_LEVEL_COLORS.items():
-        try:
-            color_map[int(level)] = color
-        except ValueError:
-            # 如果键不是数字，则跳过
-            pass
+    if fig is None:
+        plt.figure(figsize=(fig_width, fig_height))
+    else:
+        # 复用传入的图表对象，清空后调整尺寸并设为当前图表
+        fig.clf()
+        fig.set_size_inches(fig_width, fig_height)
+        plt.figure(fig.number)
     
-    # 计算绘图区域
-    left_margin = 0.12
-    right_margin = 0.88
-    top_margin = 0.92
-    bottom_margin = 0.1
+    # 一次创建共享x轴的子图，日期刻度只需计算一次
+    axes = np.atleast_1d(plt.gcf().subplots(num_cities, 1, sharex=True, gridspec_kw={'hspace': 0.25}))
+    plt.subplots_adjust(left=0.12, right=0.88, top=0.92,
+                        bottom=0.18)  # 为日期刻度与底部图例预留空间
     
     # 添加图表标题
-    date_range = f"{df['日期'].min().strftime('%Y-%m-%d')} 至 {df['日期'].max().strftime('%Y-%m-%d')}"
+    # 在numpy数组上直接求最小/最大日期，避免pandas逐次包装（忽略空日期）
+    dates_np = df['日期'].to_numpy()
+    dates_np = dates_np[~np.isnat(dates_np)]
+    date_range = f"{pd.Timestamp(dates_np.min()).strftime('%Y-%m-%d')} 至 {pd.Timestamp(dates_np.max()).strftime('%Y-%m-%d')}"
     plt.suptitle(f"花粉等级趋势图 ({date_range})", 
                 fontsize=CHART_CONFIG['title_size'],
                 y=0.98)
     
-    # 为每个城市创建子图
-    for i, city in enumerate(cities):
-        city_data = df[df['城市'] == city]
-        
-        # 创建子图
-        ax_height = (top_margin - bottom_margin) / num_cities
-        ax_position = [left_margin, 
-                      bottom_margin + (num_cities - i - 1) * ax_height, 
-                      right_margin - left_margin, 
-                      ax_height * 0.8]
-        ax = plt.axes(ax_position)
-        
+    # 一次分组得到每个城市的数据，代替逐城市布尔过滤
+    city_groups = dict(iter(df.groupby('城市', sort=False, observed=True)))
+    
+    # 为每个城市绘制子图（分组会丢弃空城市名（NaN），这类城市画一个空子图，与trend_visualization一致）
+    for ax, city in zip(axes, cities):
+        city_data = city_groups.get(city, df.iloc[0:0])
         # 绘制花粉等级趋势线
-        x = city_data['日期']
+        x = city_data['日期'].to_numpy()
         y = city_data['花粉等级']
         
         # 绘制线图
         ax.plot(x, y, '-o', markersize=4, linewidth=2, color='#205AA7', alpha=0.8)
         
-        # 为每个点添加颜色标记
-        for j, (date, level) in enumerate(zip(x, y)):
-            if pd.notna(level) and int(level) in color_map:
-                marker_color = color_map[int(level)]
-                ax.plot(date, level, 'o', markersize=8, color=marker_color)
+        # 为每个点添加颜色标记（一次散点绘制代替逐点绘制）
+        levels = y.to_numpy(dtype=float)
+        valid = (levels >= 0) & (levels < len(_COLOR_LUT_RGBA))
+        if valid.any():
+            ax.scatter(x[valid], levels[valid], 
+                      c=_COLOR_LUT_RGBA[levels[valid].astype(np.int8)], s=64, zorder=3)
         
         # 设置y轴范围和标签
         ax.set_ylim(-0.5, 5.5)
@@ -215,20 +278,6 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
         ax.set_yticklabels([POLLEN_LEVEL_NAMES.get(str(i), str(i)) for i in range(6)], 
                            fontsize=CHART_CONFIG['tick_size'])
         
-        # 设置x轴日期格式
-        max_ticks = 15
-        step_size = max(1, len(x) // max_ticks)
-        
-        # 选择日期作为刻度
-        if len(x) <= max_ticks:
-            tick_dates = x
-        else:
-            tick_dates = [date for i, date in enumerate(x) if i % step_size == 0]
-        
-        ax.set_xticks(tick_dates)
-        ax.set_xticklabels([date.strftime('%m-%d') for date in tick_dates], 
-                          rotation=45, ha='right', fontsize=CHART_CONFIG['tick_size'])
-        
         # 设置网格线
         ax.grid(True, linestyle='--', alpha=0.3)
         
@@ -236,13 +285,6 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
         ax.set_ylabel(city, fontsize=CHART_CONFIG['axes_size'], rotation=0, 
                     ha='right', va='center', labelpad=10)
         
-        # 如果不是最下面的子图，不显示x轴标签
-        if i < num_cities - 1:
-            ax.set_xticklabels([])
-            ax.set_xlabel('')
-        else:
-            ax.set_xlabel('日期', fontsize=CHART_CONFIG['axes_size'])
-        
         # 添加花粉类型信息（如果存在）
         if '花粉类型' in city_data.columns:
             pollen_types = city_data['花粉类型'].unique()
@@ -253,22 +295,32 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
                        fontsize=CHART_CONFIG['annotation_size'],
                        bbox=dict(boxstyle="round,pad=0.3", fc="#f0f0f0", ec="gray", alpha=0.8))
     
+    # 设置共享x轴的日期格式（只有最下面的子图显示刻度标签），由matplotlib在绘制时选择刻度并格式化
+    bottom_ax = axes[-1]
+    bottom_ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=15))
+    bottom_ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
+    bottom_ax.tick_params(axis='x', labelsize=CHART_CONFIG['tick_size'], labelrotation=45)
+    bottom_ax.set_xlabel('日期', fontsize=CHART_CONFIG['axes_size'])
+    
     # 添加花粉等级说明
     legend_elements = []
     for level, name in POLLEN_LEVEL_NAMES.items():
-        if level in color_map:
-            patch = plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=color_map[int(level)],
+        if level.isdigit() and int(level) < len(_COLOR_LUT_HEX):
+            patch = plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=_COLOR_LUT_HEX[int(level)],
                               markersize=10, label=f"{level}级: {name}")
             legend_elements.append(patch)
     
     # 只有当有图例元素时才添加图例
     if legend_elements:
-        plt.figlegend(handles=legend_elements, loc='center', bbox_to_anchor=(0.5, 0.02),
+        plt.figlegend(handles=legend_elements, loc='lower center', bbox_to_anchor=(0.5, 0.005),
                      ncol=min(3, len(legend_elements)), fontsize=CHART_CONFIG['legend_size'])
     
     # 保存图表
-    plt.savefig(output_path, dpi=CHART_CONFIG['dpi'], bbox_inches='tight', format=CHART_CONFIG['format'])
-    plt.close()
+    _save_figure(output_path)
+    if fig is None:
+        plt.close()
+    else:
+        fig.clf()
     
     return output_path
 
@@ -288,8 +340,7 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
     if output_dir is None:
         output_dir = get_default_output_dir()
     
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
     if filename is None:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -314,61 +365,39 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
     # 1. 花粉等级分布条形图
     ax1 = axes[0]
     
-    # 为每个城市计算不同花粉等级的分布
-    distribution_data = []
-    for city in cities:
-        city_data = df[df['城市'] == city]
-        for level in range(6):
-            count = len(city_data[city_data['花粉等级'] == level])
-            percentage = count / len(city_data) * 100 if len(city_data) > 0 else 0
-            distribution_data.append({
-                '城市': city,
-                '花粉等级': level,
-                '天数': count,
-                '百分比': percentage
-            })
-    
-    distribution_df = pd.DataFrame(distribution_data)
-    
-    # 绘制条形图
+    # 为每个城市计算不同花粉等级的分布（一次交叉统计代替逐城市逐等级过滤）
     city_order = cities
     level_order = list(range(6))
+    level_counts = pd.crosstab(df['城市'], df['花粉等级']).reindex(
+        index=city_order, columns=level_order, fill_value=0)
+    city_totals = df['城市'].value_counts().reindex(city_order, fill_value=0)
+    percentages = (level_counts.div(city_totals.replace(0, np.nan), axis=0) * 100).fillna(0).to_numpy()
+    
+    # 每一层的底部位置为前面各层百分比的累积和，标签位于各层中点，均一次算出
+    bottoms = np.concatenate([np.zeros((num_cities, 1)), np.cumsum(percentages[:, :-1], axis=1)], axis=1)
+    label_centers = bottoms + percentages / 2
     
+    # 绘制条形图
     for i, level in enumerate(level_order):
-        level_data = distribution_df[distribution_df['花粉等级'] == level]
-        bottom = np.zeros(len(city_order))
-        
-        # 如果有之前的层，获取累积高度
-        if i > 0:
-            for prev_level in range(i):
-                prev_data = distribution_df[distribution_df['花粉等级'] == prev_level]
-                for j, city in enumerate(city_order):
-                    city_prev_data = prev_data[prev_data['城市'] == city]
-                    if not city_prev_data.empty:
-                        bottom[j] += city_prev_data.iloc[0]['百分比']
-        
         # 获取颜色
-        bar_color = POLLEN_LEVEL_COLORS.get(str(level), '#999999')
+        bar_color = _COLOR_LUT_HEX[level]
         
         # 绘制当前层的条形
-        bars = ax1.bar(city_order, 
-                     level_data.set_index('城市').loc[city_order]['百分比'].values, 
-                     bottom=bottom, 
-                     color=bar_color, 
-                     alpha=0.8,
-                     label=POLLEN_LEVEL_NAMES.get(str(level), f'{level}级'))
-        
-        # 在条形上添加百分比标签（仅当百分比大于5%时）
-        for j, (city, bar) in enumerate(zip(city_order, bars)):
-            city_level_data = level_data[level_data['城市'] == city]
-            if not city_level_data.empty:
-                percentage = city_level_data.iloc[0]['百分比']
-                if percentage >= 5:  # 仅显示大于5%的标签
-                    ax1.text(j, bottom[j] + percentage/2, 
-                           f"{percentage:.0f}%", 
-                           ha='center', va='center',
-                           fontsize=CHART_CONFIG['annotation_size']-1,
-                           color='black' if percentage >= 20 else 'white')
+        ax1.bar(city_order, 
+               percentages[:, i], 
+               bottom=bottoms[:, i], 
+               color=bar_color, 
+               alpha=0.8,
+               label=POLLEN_LEVEL_NAMES.get(str(level), f'{level}级'))
+    
+    # 在条形上添加百分比标签（仅当百分比大于5%时）
+    for j, i in zip(*np.nonzero(percentages >= 5)):
+        percentage = percentages[j, i]
+        ax1.text(j, label_centers[j, i], 
+               f"{percentage:.0f}%", 
+               ha='center', va='center',
+               fontsize=CHART_CONFIG['annotation_size']-1,
+               color='black' if percentage >= 20 else 'white')
     
     # 设置图表属性
     ax1.set_title("各城市花粉等级分布", fontsize=CHART_CONFIG['title_size'])
@@ -383,15 +412,14 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
     ax2 = axes[1]
     
     # 创建每个城市每天的花粉等级数据
-    pivot_df = df.pivot_table(
-        index='城市', 
-        columns=df['日期'].dt.date, 
-        values='花粉等级',
-        aggfunc='mean'
-    )
+    days = df['日期'].to_numpy().astype('datetime64[D]')
+    pivot_df = (df.groupby([df['城市'], days], observed=True)['花粉等级'].mean()
+                .unstack()
+                .dropna(how='all')
+                .dropna(axis=1, how='all'))
     
     # 设置颜色映射
-    level_cmap = plt.cm.get_cmap('YlOrRd', 6)
+    level_cmap = _LEVEL_CMAP
     
     # 绘制热力图
     sns.heatmap(pivot_df, 
@@ -409,37 +437,38 @@ def visualize_pollen_distribution(df, output_dir=None, filename=None):
     
     # 设置日期标签
     # 如果日期过多，选择部分日期显示
-    date_cols = pivot_df.columns
+    date_labels = pd.to_datetime(pivot_df.columns).strftime('%m-%d')
     max_ticks = 15
     
-    if len(date_cols) > max_ticks:
-        step_size = len(date_cols) // max_ticks
-        tick_positions = list(range(0, len(date_cols), step_size))
-        tick_labels = [date_cols[i].strftime('%m-%d') for i in tick_positions]
+    if len(date_labels) > max_ticks:
+        step_size = len(date_labels) // max_ticks
+        tick_positions = list(range(0, len(date_labels), step_size))
+        tick_labels = date_labels[tick_positions]
         
         ax2.set_xticks(tick_positions)
         ax2.set_xticklabels(tick_labels, rotation=45, ha='right')
     else:
-        ax2.set_xticklabels([date.strftime('%m-%d') for date in date_cols], 
-                          rotation=45, ha='right')
+        ax2.set_xticklabels(date_labels, rotation=45, ha='right')
     
     # 调整布局
     plt.tight_layout()
     fig.subplots_adjust(hspace=0.3)
     
     # 保存图表
-    plt.savefig(output_path, dpi=CHART_CONFIG['dpi'], bbox_inches='tight', format=CHART_CONFIG['format'])
+    _save_figure(output_path)
     plt.close()
     
     return output_path
 
-def generate_all_visualizations(df, output_dir=None):
+def generate_all_visualizations(df, output_dir=None, max_workers=1):
     """
     为数据生成所有可视化图表
     
     参数:
         df (pandas.DataFrame): 包含花粉数据的DataFrame
         output_dir (str): 输出目录路径
+        max_workers (int): 并行生成图表的进程数，默认为1（在当前进程中顺序生成）；大于1或为None时使用进程池，
+                           进程数不超过CPU核数和图表数量
         
     返回:
         list: 所有输出文件的路径列表
@@ -448,8 +477,7 @@ def generate_all_visualizations(df, output_dir=None):
     if output_dir is None:
         output_dir = get_default_output_dir()
     
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
     # 准备数据
     prepared_df = prepare_data_for_visualization(df)
@@ -457,33 +485,59 @@ def generate_all_visualizations(df, output_dir=None):
     # 生成输出文件路径列表
     output_files = []
     
-    # 1. 所有城市的花粉趋势图
-    trend_file = visualize_pollen_trends(
-        prepared_df, 
-        output_dir=output_dir,
-        filename="all_cities_pollen_trends.png"
-    )
-    output_files.append(trend_file)
-    
-    # 2. 花粉等级分布图
-    dist_file = visualize_pollen_distribution(
-        prepared_df, 
-        output_dir=output_dir,
-        filename="pollen_distribution.png"
-    )
-    output_files.append(dist_file)
-    
-    # 3. 如果有3个或更多城市，为每个城市生成单独的趋势图
+    # 如果有3个或更多城市，还要为每个城市生成单独的趋势图；预先按城市切分数据，每个任务只传递对应城市的数据
     cities = prepared_df['城市'].unique()
+    city_frames = {}
     if len(cities) >= 3:
-        for city in cities:
-            city_df = prepared_df[prepared_df['城市'] == city]
-            city_file = visualize_pollen_trends(
-                city_df, 
-                output_dir=output_dir,
-                filename=f"{city}_pollen_trend.png"
+        city_frames = dict(iter(prepared_df.groupby('城市', sort=False, observed=True)))
+    
+    # 进程数不超过CPU核数和图表任务数（总趋势图、分布图及各城市趋势图），只需一个进程时直接顺序生成
+    cpu_count = os.cpu_count() or 1
+    worker_count = min(max_workers or cpu_count, cpu_count, 2 + len(city_frames))
+    
+    if worker_count <= 1 or not city_frames:
+        # 1. 所有城市的花粉趋势图
+        trend_file = visualize_pollen_trends(
+            prepared_df, 
+            output_dir=output_dir,
+            filename="all_cities_pollen_trends.png"
+        )
+        output_files.append(trend_file)
+        
+        # 2. 花粉等级分布图
+        dist_file = visualize_pollen_distribution(
+            prepared_df, 
+            output_dir=output_dir,
+            filename="pollen_distribution.png"
+        )
+        output_files.append(dist_file)
+        
+        # 3. 每个城市的单独趋势图，所有城市复用同一个图表对象，避免反复创建和销毁
+        if city_frames:
+            city_fig = plt.figure(figsize=CHART_CONFIG['figure_size'])
+            for city, city_df in city_frames.items():
+                city_file = visualize_pollen_trends(
+                    city_df, 
+                    output_dir=output_dir,
+                    filename=f"{city}_pollen_trend.png",
+                    fig=city_fig
+                )
+                output_files.append(city_file)
+            plt.close(city_fig)
+    else:
+        # 各图表互不依赖，使用进程池并行渲染；总趋势图和分布图渲染最慢，最先提交，与单城市趋势图同时渲染
+        # 工作进程通过初始化函数接收父进程的字体检测结果，不再各自检测
+        with ProcessPoolExecutor(max_workers=worker_count, initializer=init_font_worker,
+                                 initargs=(font_worker_state(),)) as executor:
+            futures = [
+                executor.submit(visualize_pollen_trends, prepared_df, output_dir, "all_cities_pollen_trends.png"),
+                executor.submit(visualize_pollen_distribution, prepared_df, output_dir, "pollen_distribution.png")
+            ]
+            futures.extend(
+                executor.submit(visualize_pollen_trends, city_df, output_dir, f"{city}_pollen_trend.png")
+                for city, city_df in city_frames.items()
             )
-            output_files.append(city_file)
+            output_files.extend(future.result() for future in futures)
     
     return output_files
 
@@ -8,48 +8,33 @@ def create_pollen_map(data, date_str=None, title=None):
     
     # 准备地图数据
     province_data = {}  # 按省份存储数据
-    city_data = []      # 存储城市详细数据（用于弹窗显示）
     
-    # 从数据中提取城市和对应的花粉等级
-    for _, row in data.iterrows():
-        city_name = row['城市']
-        level = row['花粉等级']
-        desc = row.get('等级描述', '')
-        color_code = row.get('颜色代码', LEVEL_COLOR_MAP.get(level, '#999999'))
-        
-        # 获取城市坐标
-        coordinates = get_city_coordinates(city_name)
-        if coordinates is None:
+    # 批量提取省份名称（简单处理：取城市名前两个字符，去掉末尾一个"市"、"省"或"区"，如"北京市"取"北京"）
+    provinces = data['城市'].str.slice(0, 2).str.replace(r'[市省区]$', '', regex=True).to_numpy()
+    
+    # 按列取出城市和花粉等级，逐行组合时无需为每行构造Series
+    city_names = data['城市'].to_numpy()
+    levels = data['花粉等级'].to_numpy()
+    
+    # 花粉等级到数值的映射（按LEVEL_SIZE_MAP中的顺序，用于热力图显示）
+    level_values = {level: index * 10 for index, level in enumerate(LEVEL_SIZE_MAP)}
+    
+    # 按列收集有坐标的城市所在省份及其等级数值，不再为每个城市构造记录字典
+    city_provinces = []
+    city_values = []
+    for city_name, level, province_name in zip(city_names, levels, provinces):
+        # 跳过没有坐标的城市
+        if get_city_coordinates(city_name) is None:
             continue
-            
-        # 将花粉等级映射为数值，用于热力图显示
-        level_value = list(LEVEL_SIZE_MAP.keys()).index(level) * 10 if level in LEVEL_SIZE_MAP else 0
-        
-        # 提取省份名称（简单处理：取城市名前两个字符，如"北京市"取"北京"）
-        province_name = city_name[:2]
-        if province_name.endswith(('市', '省', '区')):
-            province_name = province_name[:-1]
-        
-        # 更新省份数据（取同一省份中的最高等级）
-        if province_name in province_data:
-            if level_value > province_data[province_name]:
-                province_data[province_name] = level_value
-        else:
-            province_data[province_name] = level_value
-        
-        # 添加城市数据（用于弹窗显示）
-        city_data.append({
-            "name": city_name,
-            "province": province_name,
-            "value": level_value,
-            "level": level,
-            "desc": desc,
-            "color": color_code,
-            "coordinates": coordinates
-        })
+        city_provinces.append(province_name)
+        city_values.append(level_values.get(level, 0))
+    
+    # 更新省份数据（取同一省份中的最高等级）
+    if city_values:
+        province_data = pd.Series(city_values).groupby(city_provinces, sort=False).max().to_dict()
     
     # 转换为地图所需的数据格式
-    map_data = [(province, value) for province, value in province_data.items()]
+    map_data = list(province_data.items())
     
     # 创建地图实例
     map_chart = Map(init_opts=opts.InitOpts(
@@ -11,6 +11,7 @@ import datetime
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import matplotlib.font_manager as fm
 import matplotlib.colors as mcolors
 import matplotlib.dates as mdates
 import seaborn as sns
@@ -29,6 +30,14 @@ from ..config.visualization_config import (
     get_default_output_dir
 )
 
+# 模块导入时配置一次字体，并缓存字体属性对象，优先使用sans-serif字体族
+configure_matplotlib_fonts()
+try:
+    _FONT_PROP = fm.FontProperties(family='sans-serif')
+except Exception:
+    _FONT_PROP = None
+plt.rcParams.update({'font.family': 'sans-serif', 'axes.unicode_minus': False})
+
 def visualize_pollen_trends(df, output_dir=None, filename=None):
     """
     生成花粉趋势图
@@ -46,24 +55,15 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
         print("警告: 数据为空，无法生成趋势图")
         return None
     
-    # 配置matplotlib字体
-    configure_matplotlib_fonts()
-    
-    # 尝试获取一个可用的字体属性对象
-    try:
-        import matplotlib.font_manager as fm
-        # 直接创建字体属性对象，优先使用sans-serif字体族
-        font_prop = fm.FontProperties(family='sans-serif')
-    except Exception:
-        font_prop = None
+    # 使用模块级缓存的字体属性对象
+    font_prop = _FONT_PROP
     
     # 设置输出目录
     if output_dir is None:
         output_dir = get_default_output_dir()
     
     # 确保输出目录存在
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
         
     # 获取唯一城市列表
     cities = df['城市'].unique().tolist()
@@ -98,29 +98,23 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
         
     # 检查是否存在'花粉等级'列，如果没有则尝试从花粉指数估算
     if '花粉等级' not in df.columns and '花粉指数' in df.columns:
-        def get_level(value):
-            if value < 10:
-                return 0  # 未检测
-            elif value < 30:
-                return 1  # 很低
-            elif value < 50:
-                return 2  # 较低
-            elif value < 70:
-                return 3  # 偏高
-            elif value < 90:
-                return 4  # 较高
-            else:
-                return 5  # 很高
-        
-        df['花粉等级'] = df['花粉指数'].apply(get_level)
+        # 等级分界: <10未检测, <30很低, <50较低, <70偏高, <90较高, 其余为很高
+        level_bins = np.array([10, 30, 50, 70, 90])
+        df['花粉等级'] = np.searchsorted(level_bins, df['花粉指数'].to_numpy(dtype=float), side='right').astype(np.int8)
+    
+    # 确保日期是datetime类型，并整体按日期排序一次
+    sorted_df = df
+    if not pd.api.types.is_datetime64_any_dtype(sorted_df['日期']):
+        sorted_df = sorted_df.assign(日期=pd.to_datetime(sorted_df['日期']))
+    sorted_df = sorted_df.sort_values('日期', kind='stable')
+    
+    # 一次分组得到每个城市的数据，代替逐城市布尔过滤
+    city_groups = dict(iter(sorted_df.groupby('城市', sort=False, observed=True)))
     
     # 绘制每个城市的趋势线
     for i, city in enumerate(cities):
-        city_data = df[df['城市'] == city].sort_values('日期')
-        
-        # 确保日期是datetime类型
-        if not pd.api.types.is_datetime64_any_dtype(city_data['日期']):
-            city_data['日期'] = pd.to_datetime(city_data['日期'])
+        # 分组会丢弃空城市名（NaN），这类城市画一条空线，与逐城市过滤时的结果一致
+        city_data = city_groups.get(city, sorted_df.iloc[0:0])
         
         # 绘制趋势线
         plt.plot(
@@ -142,11 +136,6 @@ def visualize_pollen_trends(df, output_dir=None, filename=None):
     ax.xaxis.set_major_formatter(date_formatter)
     ax.xaxis.set_major_locator(mdates.AutoDateLocator())
     
-    # 确保所有标签使用正确的字体
-    if font_prop:
-        for label in ax.get_xticklabels() + ax.get_yticklabels():
-            label.set_fontproperties(font_prop)
-    
     # 设置y轴标签
     if font_prop:
         plt.ylabel("花粉指数", fontsize=CHART_CONFIG['axes_size'], fontproperties=font_prop)
@@ -7,12 +7,37 @@
 """
 
 import os
-import glob
+import fnmatch
 import pandas as pd
 import datetime
 
 from ..config.visualization_config import get_default_data_dir, get_default_output_dir
 
+def _scan_data_files(data_dir, pattern="*.csv"):
+    """
+    扫描目录中的数据文件，并保留每个文件的stat结果
+    
+    参数:
+        data_dir (str): 数据目录
+        pattern (str): 文件匹配模式
+        
+    返回:
+        list: (文件路径, os.stat_result) 元组列表，按修改时间从新到旧排序
+    """
+    with os.scandir(data_dir) as it:
+        entries = [
+            (entry.path, entry.stat())
+            for entry in it
+            if not entry.name.startswith('.')
+            and fnmatch.fnmatch(entry.name, pattern)
+            and entry.is_file()
+        ]
+    
+    # 按修改时间排序，复用已获取的stat结果
+    entries.sort(key=lambda item: item[1].st_mtime, reverse=True)
+    
+    return entries
+
 def find_data_files(data_dir=None, pattern="*.csv"):
     """
     在指定目录中查找数据文件
@@ -32,14 +57,7 @@ def find_data_files(data_dir=None, pattern="*.csv"):
         os.makedirs(data_dir, exist_ok=True)
         return []
     
-    # 查找匹配的文件
-    search_path = os.path.join(data_dir, pattern)
-    files = glob.glob(search_path)
-    
-    # 按修改时间排序
-    files.sort(key=os.path.getmtime, reverse=True)
-    
-    return files
+    return [path for path, _ in _scan_data_files(data_dir, pattern)]
 
 def display_available_data_files(data_dir=None):
     """
@@ -54,21 +72,24 @@ def display_available_data_files(data_dir=None):
     if data_dir is None:
         data_dir = get_default_data_dir()
     
-    files = find_data_files(data_dir)
+    # 确保目录存在
+    os.makedirs(data_dir, exist_ok=True)
+    
+    entries = _scan_data_files(data_dir)
     
-    if not files:
+    if not entries:
         print(f"在目录 {data_dir} 中没有找到数据文件。")
         return []
     
-    print(f"找到 {len(files)} 个数据文件:")
-    for i, file_path in enumerate(files):
+    print(f"找到 {len(entries)} 个数据文件:")
+    for i, (file_path, file_stat) in enumerate(entries):
         file_name = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path) / 1024  # KB
-        file_time = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
+        file_size = file_stat.st_size / 1024  # KB
+        file_time = datetime.datetime.fromtimestamp(file_stat.st_mtime)
         
         print(f"{i+1}. {file_name} ({file_size:.1f} KB, {file_time})")
     
-    return files
+    return [file_path for file_path, _ in entries]
 
 def ensure_output_dir(output_dir=None):
     """
@@ -10,19 +10,29 @@ import os
 import sys
 import pandas as pd
 import numpy as np
-import argparse
 import json
-import re
+import gzip
+import hashlib
+import traceback
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from pyecharts import options as opts
-from pyecharts.charts import Map, Geo, EffectScatter, Grid
-from pyecharts.globals import ThemeType
-from pyecharts.commons.utils import JsCode
+from pyecharts.charts import Geo
+from pyecharts.globals import ThemeType, CurrentConfig
+from pyecharts.charts.base import default as chart_json_default
+from pyecharts.commons.utils import replace_placeholder
 import tempfile
 import csv
 import random
-import shutil
+import urllib.request
 from pathlib import Path
+from jinja2 import ChoiceLoader, FileSystemLoader
+
+# orjson为可选依赖，不可用时退回标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 添加调试信息
 print("脚本开始执行...")
@@ -33,12 +43,190 @@ pollen_levels = [
     0, 2.5, 5.0, 7.5, 15, 30, 60, 90
 ]
 
+# 花粉等级名称到数值的映射
+level_value_map = {
+    '暂无': 0, '很低': 1, '低': 2, '中': 3,
+    '高': 4, '很高': 5, '极高': 6
+}
+
+# 花粉等级数值到名称的映射
+level_name_map = {
+    0: '暂无',
+    1: '很低',
+    2: '低',
+    3: '中',
+    4: '高',
+    5: '很高',
+    6: '极高'
+}
+
+# 花粉等级数值到颜色的映射
+level_color_map = {
+    0: "#C4A39F",  # 暂无
+    1: "#81CB31",  # 很低 - 冷色
+    2: "#A1FF3D",  # 低 - 冷色
+    3: "#F5EE32",  # 中 - 中性
+    4: "#FF642E",  # 高 - 暖色
+    5: "#FF2319",  # 很高 - 暖色
+    6: "#CC0000"   # 极高 - 暖色
+}
+
+# 分段视觉映射的各等级配置（与日期无关，只构建一次）
+level_pieces = [
+    {"value": level, "label": name, "color": level_color_map[level]}
+    for level, name in level_name_map.items()
+]
+
+# 散点提示框格式化函数（所有日期的地图共用）。pyecharts的JsCode序列化时会去掉换行，
+# 使函数中的//注释吞掉后面的代码，因此配置项中先写入占位字符串，序列化后再整体替换为保留换行的函数源码
+map_tooltip_formatter_placeholder = "--pollen-tooltip-formatter--"
+map_tooltip_formatter_js = """function(params) {
+    var levelMap = {
+        0: '暂无',
+        1: '很低',
+        2: '低',
+        3: '中',
+        4: '高',
+        5: '很高',
+        6: '极高'
+    };
+    var value = params.value[2];
+    var levelText = levelMap[value] || '未知';
+    
+    // 检测是否为移动设备，如果是则添加提示
+    var isMobile = /iPhone|iPad|iPod|Android/i.test(navigator.userAgent);
+    var touchTip = isMobile ? '<br/>(点击可放大地图)' : '';
+    
+    return params.name + '<br/>花粉等级: ' + levelText + touchTip;
+}"""
+
+# 地图的固定配置项（各日期相同，模块加载时创建一次；pyecharts序列化时只读取不修改，可在各图表间共用）
+map_schema_label_opts = opts.LabelOpts(
+    is_show=True,  # 显示省份名称
+    font_size=10,
+    color="#000000"
+)
+map_schema_itemstyle_opts = opts.ItemStyleOpts(
+    color="#F7F7F7",  # 统一的浅灰色背景
+    border_width=0.5,
+    border_color="#DDDDDD",
+)
+map_schema_emphasis_itemstyle_opts = opts.ItemStyleOpts(
+    border_width=1,
+    border_color="#000000",
+    opacity=0.9
+)
+map_series_label_opts = opts.LabelOpts(
+    is_show=True,
+    formatter="{b}",
+    position="right",
+    font_size=10,
+    color="#333"
+)
+map_series_itemstyle_opts = opts.ItemStyleOpts(opacity=0.8)
+map_series_tooltip_opts = opts.TooltipOpts(formatter=map_tooltip_formatter_placeholder)
+map_legend_opts = opts.LegendOpts(
+    type_="scroll",
+    pos_left="right",
+    pos_top="center",
+    orient="vertical",
+    item_width=25,
+    item_height=14,
+    # 明确指定图例项的顺序
+    selected_mode=False,
+    # 自定义图例项的顺序
+    legend_icon="circle",
+    textstyle_opts=opts.TextStyleOpts(color="#333"),
+    # 为确保顺序正确，这里手动设置图例项的顺序
+    is_show=True  # 显示图例
+)
+map_visualmap_opts = opts.VisualMapOpts(
+    is_show=True,
+    type_="piecewise",  # 使用分段型视觉映射
+    pieces=level_pieces,
+    pos_left="2%",  # 调整到左侧
+    pos_top="middle",  # 垂直居中
+    orient="vertical",  # 确保纵向显示
+    item_width=20,
+    item_height=15,  # 减小高度使图例更紧凑
+    textstyle_opts=opts.TextStyleOpts(
+        font_size=12,
+        color="#333333"
+    ),
+    is_calculable=False  # 禁用数值范围选择
+)
+
+def create_effect_opts(color):
+    """创建散点的涟漪特效配置"""
+    return opts.EffectOpts(
+        is_show=True,
+        scale=3.5,
+        period=4,
+        color=color,
+        brush_type="stroke"
+    )
+
+# 各花粉等级的涟漪特效配置
+level_effect_opts = {level: create_effect_opts(color) for level, color in level_color_map.items()}
+
+# 地图页面引用echarts脚本的位置，为空时使用pyecharts默认的CDN地址
+map_js_host = ""
+
 # 城市坐标缓存
 city_coordinates = {}
 
+# 城市坐标查找索引：在原始城市名之外预先登记带“市/区/县”后缀的别名，查找时只需一次字典访问
+city_coordinate_index = {}
+
+# 直辖市名称（其下属区县直接使用直辖市的坐标）
+municipality_prefixes = frozenset(['北京', '上海', '天津', '重庆'])
+
 # 全局数据变量
 available_dates = []
 pollen_data = None
+date_groups = {}  # 按日期预先分组的数据，格式：{日期: DataFrame}
+
+def write_bytes_atomic(file_path, data):
+    """原子写入字节：先写同目录临时文件再os.replace替换，中途中断不会留下被增量清单误认为已生成的残缺文件"""
+    temp_path = Path(f"{file_path}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, file_path)
+
+def write_bytes_if_changed(file_path, data):
+    """内容与已有文件相同时跳过写入（保留原文件及其修改时间，部署和同步时不会被当作变更），返回是否写入"""
+    path = Path(file_path)
+    if path.is_file() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+    write_bytes_atomic(file_path, data)
+    return True
+
+def write_html_file(file_path, html_content, gzip_output=False):
+    """一次编码为UTF-8字节后整块原子写入HTML文件（gzip_output为True时同时写入预压缩的.gz文件，供支持静态gzip的服务器直接发送）"""
+    html_bytes = html_content.encode('utf-8')
+    write_bytes_atomic(file_path, html_bytes)
+    if gzip_output:
+        write_bytes_atomic(file_path + '.gz', gzip.compress(html_bytes, compresslevel=6))
+
+def precompress_assets(assets_dir):
+    """为assets目录下的脚本、样式和图标生成预压缩的.gz文件（压缩结果固定，内容不变时跳过写入）"""
+    for path in Path(assets_dir).rglob('*'):
+        if path.suffix in ('.js', '.css', '.svg') and path.is_file():
+            # mtime=0使相同内容的压缩结果完全一致，配合write_bytes_if_changed避免每次运行都改写
+            write_bytes_if_changed(f"{path}.gz", gzip.compress(path.read_bytes(), compresslevel=9, mtime=0))
+
+def read_json_file(file_path):
+    """读取JSON文件（优先使用orjson直接解析字节）"""
+    if orjson is not None:
+        return orjson.loads(Path(file_path).read_bytes())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json_file(file_path, data):
+    """写入JSON文件（优先使用orjson，非ASCII字符原样输出，不做转义）"""
+    if orjson is not None:
+        write_bytes_if_changed(file_path, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    write_bytes_if_changed(file_path, json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8'))
 
 def load_city_coordinates():
     """加载城市坐标数据"""
@@ -49,8 +237,7 @@ def load_city_coordinates():
         coord_file = os.path.join(script_dir, 'city_coordinates.json')
         
         if os.path.exists(coord_file):
-            with open(coord_file, 'r', encoding='utf-8') as f:
-                city_coordinates = json.load(f)
+            city_coordinates = read_json_file(coord_file)
             print(f"已加载 {len(city_coordinates)} 个城市坐标")
         else:
             print("城市坐标文件不存在，将使用默认中国城市坐标")
@@ -78,80 +265,102 @@ def load_city_coordinates():
                 "青岛": [120.379477, 36.066328]
             }
             # 保存基本坐标到文件
-            with open(coord_file, 'w', encoding='utf-8') as f:
-                json.dump(city_coordinates, f, ensure_ascii=False, indent=4)
+            write_json_file(coord_file, city_coordinates)
             print(f"已创建默认城市坐标文件，包含 {len(city_coordinates)} 个城市")
     except Exception as e:
         print(f"加载城市坐标时出错: {str(e)}")
         city_coordinates = {}
+    
+    build_city_coordinate_index()
+
+def build_city_coordinate_index():
+    """根据city_coordinates构建坐标查找索引（原始城市名优先于后缀别名）"""
+    global city_coordinate_index
+    index = {}
+    for name, coordinates in city_coordinates.items():
+        for suffix in ('市', '区', '县'):
+            index[name + suffix] = coordinates
+    index.update(city_coordinates)
+    city_coordinate_index = index
 
 def get_city_coordinates(city_name):
     """获取城市坐标"""
-    # 直接从缓存中获取
-    if city_name in city_coordinates:
-        return city_coordinates[city_name]
-    
-    # 处理特殊情况
-    if city_name.endswith(('市', '区', '县')):
-        # 尝试去掉后缀
-        short_name = city_name[:-1]
-        if short_name in city_coordinates:
-            return city_coordinates[short_name]
+    # 城市名及带后缀的别名均已登记在索引中
+    coordinates = city_coordinate_index.get(city_name)
+    if coordinates is not None:
+        return coordinates
     
-    # 如果是直辖市的某个区，直接使用直辖市的坐标
-    for prefix in ['北京', '上海', '天津', '重庆']:
-        if city_name.startswith(prefix) and prefix in city_coordinates:
-            return city_coordinates[prefix]
+    # 如果是直辖市的某个区，直接使用直辖市的坐标（并登记到索引中，之后同名查找只需一次字典访问）
+    prefix = city_name[:2]
+    if prefix in municipality_prefixes and prefix in city_coordinates:
+        coordinates = city_coordinate_index[city_name] = city_coordinates[prefix]
+        return coordinates
     
     # 如果找不到，返回None
     print(f"警告: 无法找到城市 '{city_name}' 的坐标")
     return None
 
-def load_data(file_path):
-    """加载花粉数据"""
+def load_data(file_path, data=None):
+    """加载花粉数据（传入data时直接使用该DataFrame，不读取文件）"""
     global available_dates
     global pollen_data
+    global date_groups
     
     try:
-        print(f"正在加载数据文件: {file_path}")
-        
-        # 读取CSV数据
-        df = pd.read_csv(file_path)
-        
-        # 确保日期列存在
-        if '日期' not in df.columns:
-            print("错误：数据文件缺少'日期'列")
-            return False
-        
-        # 确保城市列存在
-        if '城市' not in df.columns:
-            print("错误：数据文件缺少'城市'列")
-            return False
-        
-        # 确保花粉等级列存在
-        if '花粉等级' not in df.columns:
-            print("错误：数据文件缺少'花粉等级'列")
-            return False
-        
-        # 转换日期格式
+        # 只使用用到的列；花粉等级取值很少，使用分类类型
+        read_options = {
+            'usecols': ['日期', '城市', '花粉等级'],
+            'dtype': {'城市': 'string', '花粉等级': 'category'}
+        }
+        if data is not None:
+            print("正在加载内存中的数据")
+            missing_column = next((column for column in read_options['usecols'] if column not in data.columns), None)
+            if missing_column is not None:
+                print(f"错误：数据缺少'{missing_column}'列")
+                return False
+            all_df = data[read_options['usecols']].astype(read_options['dtype'])
+        else:
+            print(f"正在加载数据文件: {file_path}")
+            try:
+                try:
+                    all_df = pd.read_csv(file_path, engine='pyarrow', **read_options)
+                except ImportError:
+                    # 未安装pyarrow时使用默认的C解析引擎
+                    all_df = pd.read_csv(file_path, **read_options)
+            except ValueError:
+                # 缺少必要的列时usecols会报错，此时才单独读取表头，找出缺少的列
+                columns = pd.read_csv(file_path, nrows=0).columns
+                missing_column = next((column for column in read_options['usecols'] if column not in columns), None)
+                if missing_column is None:
+                    raise
+                print(f"错误：数据文件缺少'{missing_column}'列")
+                return False
+        
+        # 转换日期格式（日期重复度很高，只对不重复的日期解析并格式化一次，再映射回整列；
+        # 结果保存为分类类型，每行只存储整数编码，不为每行保存一个字符串对象）
         try:
-            df['日期'] = pd.to_datetime(df['日期']).dt.strftime('%Y-%m-%d')
+            unique_dates = all_df['日期'].dropna().unique()
+            try:
+                parsed_dates = pd.to_datetime(unique_dates, format='%Y-%m-%d')
+            except (ValueError, TypeError):
+                # 日期不是YYYY-MM-DD格式时退回自动推断
+                parsed_dates = pd.to_datetime(unique_dates)
+            all_df['日期'] = all_df['日期'].map(dict(zip(unique_dates, parsed_dates.strftime('%Y-%m-%d')))).astype('category')
         except Exception as e:
             print(f"转换日期格式时出错: {str(e)}")
             return False
         
         # 过滤出2025年的日期
-        df = df[df['日期'].str.startswith('2025')]
+        df = all_df[all_df['日期'].str.startswith('2025', na=False)]
         if len(df) == 0:
             print("警告：数据中没有2025年的记录，将使用所有可用日期")
-            # 如果没有2025年的记录，恢复使用原始数据
-            df = pd.read_csv(file_path)
-            df['日期'] = pd.to_datetime(df['日期']).dt.strftime('%Y-%m-%d')
+            # 如果没有2025年的记录，恢复使用原始数据（无需重新读取文件）
+            df = all_df
         else:
             print("成功过滤出2025年的记录")
         
-        # 提取可用日期
-        available_dates = sorted(df['日期'].unique())
+        # 提取可用日期（转为定长字符串数组后由numpy排序，YYYY-MM-DD格式的字典序即日期顺序）
+        available_dates = np.sort(df['日期'].dropna().unique().astype(str)).tolist()
         
         print(f"发现 {len(available_dates)} 个可用日期")
         for date in available_dates[:5]:
@@ -162,10 +371,12 @@ def load_data(file_path):
         # 保存数据
         pollen_data = df
         
+        # 一次分组得到各日期的数据，按日期筛选时直接查表（只保留实际出现的日期）
+        date_groups = dict(iter(df.groupby('日期', sort=False, observed=True)))
+        
         return True
     except Exception as e:
         print(f"加载数据时出错: {str(e)}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -174,195 +385,124 @@ def filter_data_by_date(date_str):
     if pollen_data is None:
         return None
     
-    if date_str not in available_dates:
+    # 从预先分组的数据中取出指定日期的数据
+    filtered_data = date_groups.get(date_str)
+    if filtered_data is None:
         print(f"错误：无效的日期 {date_str}")
         return None
     
-    # 筛选指定日期的数据
-    filtered_data = pollen_data[pollen_data['日期'] == date_str]
-    
     print(f"为日期 {date_str} 筛选出 {len(filtered_data)} 条数据")
     
     return filtered_data
 
-def create_map(date_str):
-    """创建花粉分布地图"""
+# 序列化时临时替代散点数据的占位对象（非字典/列表，pyecharts清理配置项时会原样保留）
+series_data_placeholder = object()
+
+class PollenGeo(Geo):
+    """以紧凑JSON序列化配置项的Geo图表（优先使用orjson，不可用时使用标准库json）"""
+
+    def get_options(self):
+        # 散点数据是由城市名和坐标组成的简单字典列表，不含空值，无需pyecharts逐个数据点递归清理；
+        # 清理时先用占位对象代替（保持键的顺序），清理完成后再放回原数据
+        all_series = self.options.get('series', [])
+        series_data = [series.get('data') for series in all_series]
+        for series in all_series:
+            series['data'] = series_data_placeholder
+        try:
+            options = super().get_options()
+        finally:
+            for series, data in zip(all_series, series_data):
+                series['data'] = data
+        for series, data in zip(options.get('series', []), series_data):
+            if series.get('data') is series_data_placeholder:
+                series['data'] = data
+        return options
+
+    def dump_options(self):
+        return dump_chart_json(self.get_options())
+
+def dump_chart_json(data):
+    """将图表配置项序列化为可直接嵌入页面脚本的紧凑JSON（优先使用orjson，不可用时使用标准库json）"""
+    # 配置项以紧凑格式输出（不缩进、不加空格），页面中的配置项不需要人工阅读，可明显减小每个地图页面的体积
+    if orjson is not None:
+        options_json = orjson.dumps(
+            data,
+            default=chart_json_default,
+            option=orjson.OPT_NON_STR_KEYS,
+        ).decode()
+    else:
+        options_json = json.dumps(
+            data,
+            default=chart_json_default,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
+    options_json = replace_placeholder(options_json)
+    # 将提示框formatter的占位字符串替换为函数源码（普通字符串替换，无需在渲染后的整页HTML上执行正则）
+    return options_json.replace(f'"{map_tooltip_formatter_placeholder}"', map_tooltip_formatter_js)
+
+def create_map(date_str, data=None):
+    """创建花粉分布地图（data为该日期已筛选的数据，为None时从全局数据中筛选）"""
     try:
         # 获取该日期的数据
-        data = filter_data_by_date(date_str)
+        if data is None:
+            data = filter_data_by_date(date_str)
         if data is None or len(data) == 0:
             print(f"错误：日期 {date_str} 没有可用数据")
             return None
         
         print(f"为日期 {date_str} 创建地图...")
         
-        # 从数据中提取城市、省份和花粉值
-        city_data = []  # 格式：[(城市, 花粉数值), ...]
-        city_province_data = []  # 格式：[(城市, 省份, 花粉数值), ...]
-        province_values = {}  # 按省份存储最大花粉值
+        # 从数据中提取城市和花粉值（整列映射代替逐行遍历）
+        city_names = data['城市']
         
-        for _, row in data.iterrows():
-            city_name = row['城市']
-            level = row['花粉等级']
-            
-            # 将花粉等级映射为数值
-            level_map = {
-                '暂无': 0, '很低': 1, '低': 2, '中': 3,
-                '高': 4, '很高': 5, '极高': 6
-            }
-            level_value = level_map.get(level, 0)
-            
-            # 城市到省份的映射（与map_server_example.py保持一致）
-            city_to_province = {
-                '北京': '北京', '上海': '上海', '天津': '天津', '重庆': '重庆',
-                '广州': '广东', '深圳': '广东', '杭州': '浙江', '南京': '江苏', 
-                '武汉': '湖北', '成都': '四川', '西安': '陕西', '沈阳': '辽宁', 
-                '哈尔滨': '黑龙江', '长春': '吉林', '长沙': '湖南', '福州': '福建', 
-                '郑州': '河南', '济南': '山东', '青岛': '山东', '苏州': '江苏'
-            }
-            
-            # 如果城市在映射中，使用映射指定的省份
-            province_name = city_to_province.get(city_name)
-            if not province_name:
-                # 如果没有直接映射，尝试简单提取省份名
-                province_name = city_name[:2]
-                if province_name.endswith(('市', '省', '区')):
-                    province_name = province_name[:-1]
-            
-            city_data.append((city_name, level_value))
-            city_province_data.append((city_name, province_name, level_value))
-        
-        # 计算每个省份的最大花粉值
-        for city, province, value in city_province_data:
-            if province in province_values:
-                province_values[province] = max(province_values[province], value)
-            else:
-                province_values[province] = value
+        # 将花粉等级映射为数值
+        level_values = data['花粉等级'].map(level_value_map).fillna(0).astype(int)
         
-        # 转换为地图所需格式
-        province_data = [(province, value) for province, value in province_values.items()]
+        city_data = list(zip(city_names.tolist(), level_values.tolist()))  # 格式：[(城市, 花粉数值), ...]
         
         print(f"已准备 {len(city_data)} 个城市的数据")
         for city, value in city_data[:5]:
             print(f"示例数据: 城市: {city}, 花粉数值: {value}")
         
-        print("加载pyecharts库...")
-        # 创建初始化选项 - 直接使用pyecharts
-        from pyecharts import options as opts
-        from pyecharts.charts import Map, Geo, Grid
-        from pyecharts.globals import ThemeType
-        from pyecharts.commons.utils import JsCode
-        
         print("创建图表初始化选项...")
         init_opts = opts.InitOpts(
             width="100%", 
             height="600px",
             theme=ThemeType.LIGHT,
             page_title=f"全国花粉分布地图 - {date_str}",
-            renderer="canvas"  # 使用canvas渲染器更适合交互
-        )
-        
-        print("创建地图实例...")
-        # 创建地图实例
-        map_chart = Map(init_opts=init_opts)
-        
-        print("添加省份填充地图...")
-        # 添加省份填充地图 - 设置为统一的浅灰色背景
-        map_chart.add(
-            series_name="",  # 使用空字符串作为系列名称，这样图例中不会显示省份
-            data_pair=[(p, 0) for p, _ in province_data],  # 所有省份使用相同的值
-            maptype="china",
-            is_roam=True,  # 允许缩放和平移
-            label_opts=opts.LabelOpts(
-                is_show=True,  # 显示省份名称
-                font_size=10,
-                color="#000000"
-            ),
-            itemstyle_opts=opts.ItemStyleOpts(
-                color="#F7F7F7",  # 统一的浅灰色背景
-                border_width=0.5,
-                border_color="#DDDDDD",
-            ),
-            emphasis_itemstyle_opts=opts.ItemStyleOpts(
-                border_width=1,
-                border_color="#000000",
-                opacity=0.9
-            ),
-            tooltip_opts=opts.TooltipOpts(
-                is_show=False  # 不显示省份的悬浮提示
-            )
-        )
-        
-        print("设置地图全局选项...")
-        # 设置全局选项 - 删除标题
-        map_chart.set_global_opts(
-            title_opts=opts.TitleOpts(
-                title="",  # 删除标题
-                subtitle="",
-                pos_left="center"
-            ),
-            tooltip_opts=opts.TooltipOpts(
-                trigger="item"
-            )
+            renderer="canvas",  # 使用canvas渲染器更适合交互
+            js_host=map_js_host
         )
         
         print("创建散点图实例...")
         # 创建散点图实例
-        scatter = Geo(init_opts=init_opts)
+        scatter = PollenGeo(init_opts=init_opts)
         
         print("添加基础地图...")
-        # 添加基础地图
+        # 添加基础地图 - 直接作为统一浅灰色背景的省份底图，无需额外的省份填充图层
         scatter.add_schema(
             maptype="china",
-            itemstyle_opts=opts.ItemStyleOpts(
-                color="rgba(255, 255, 255, 0)",  # 透明背景
-                border_color="rgba(255, 255, 255, 0)",  # 透明边界
-            ),
-            label_opts=opts.LabelOpts(is_show=False)  # 不显示标签
-        )
-        
-        # 设置散点图可缩放平移
-        scatter.set_global_opts(
-            tooltip_opts=opts.TooltipOpts(trigger="item")
+            is_roam=True,  # 允许缩放和平移
+            label_opts=map_schema_label_opts,
+            itemstyle_opts=map_schema_itemstyle_opts,
+            emphasis_itemstyle_opts=map_schema_emphasis_itemstyle_opts
         )
         
-        # 颜色映射
-        color_map = {
-            0: "#C4A39F",  # 暂无
-            1: "#81CB31",  # 很低 - 冷色
-            2: "#A1FF3D",  # 低 - 冷色
-            3: "#F5EE32",  # 中 - 中性
-            4: "#FF642E",  # 高 - 暖色
-            5: "#FF2319",  # 很高 - 暖色
-            6: "#CC0000"   # 极高 - 暖色
-        }
-        
-        # 等级文本映射
-        level_map = {
-            0: '暂无',
-            1: '很低',
-            2: '低',
-            3: '中',
-            4: '高',
-            5: '很高',
-            6: '极高'
-        }
-        
         print("分组城市数据...")
         # 按等级分组城市数据
-        level_data_dict = {}
-        for city, province, value in city_province_data:
-            if value not in level_data_dict:
-                level_data_dict[value] = []
-            level_data_dict[value].append((city, value))
+        level_data_dict = {
+            int(level): [(city, int(level)) for city in level_cities]
+            for level, level_cities in city_names.groupby(level_values)
+        }
         
         print("创建各等级散点图...")
         # 按照等级顺序添加散点图系列，确保图例也按照此顺序显示
         ordered_levels = sorted(level_data_dict.keys())
         for level in ordered_levels:
             data = level_data_dict[level]
-            level_name = level_map.get(level, f"等级{level}")
-            color = color_map.get(level, "#888888")
+            level_name = level_name_map.get(level, f"等级{level}")
+            color = level_color_map.get(level, "#888888")
             
             scatter.add(
                 series_name=level_name,
@@ -370,243 +510,55 @@ def create_map(date_str):
                 type_="effectScatter",
                 symbol_size=12,
                 color=color,
-                effect_opts=opts.EffectOpts(
-                    is_show=True,
-                    scale=3.5,
-                    period=4,
-                    color=color,
-                    brush_type="stroke"
-                ),
-                label_opts=opts.LabelOpts(
-                    is_show=True,
-                    formatter="{b}",
-                    position="right",
-                    font_size=10,
-                    color="#333"
-                ),
-                itemstyle_opts=opts.ItemStyleOpts(opacity=0.8),
-                tooltip_opts=opts.TooltipOpts(
-                    formatter=JsCode("""
-function(params) {
-    var levelMap = {
-        0: '暂无',
-        1: '很低',
-        2: '低',
-        3: '中',
-        4: '高',
-        5: '很高',
-        6: '极高'
-    };
-    var value = params.value[2];
-    var levelText = levelMap[value] || '未知';
-    
-    // 检测是否为移动设备，如果是则添加提示
-    var isMobile = /iPhone|iPad|iPod|Android/i.test(navigator.userAgent);
-    var touchTip = isMobile ? '<br/>(点击可放大地图)' : '';
-    
-    return params.name + '<br/>花粉等级: ' + levelText + touchTip;
-}
-""")
-                )
+                effect_opts=level_effect_opts.get(level) or create_effect_opts(color),
+                label_opts=map_series_label_opts,
+                itemstyle_opts=map_series_itemstyle_opts,
+                tooltip_opts=map_series_tooltip_opts
             )
         
         print("设置图例...")
-        # 按等级顺序创建图例类别列表
-        legend_categories = [level_map[i] for i in range(7)]
-        
-        # 添加图例和视觉映射
+        # 添加图例和视觉映射（全局选项只设置一次：set_global_opts每次都会重置提示框等选项，
+        # 提前单独设置提示框的调用会被这里覆盖，是多余的）
         scatter.set_global_opts(
-            legend_opts=opts.LegendOpts(
-                type_="scroll",
-                pos_left="right",
-                pos_top="center",
-                orient="vertical",
-                item_width=25,
-                item_height=14,
-                # 明确指定图例项的顺序
-                selected_mode=False,
-                # 自定义图例项的顺序
-                legend_icon="circle",
-                textstyle_opts=opts.TextStyleOpts(color="#333"),
-                # 为确保顺序正确，这里手动设置图例项的顺序
-                is_show=True  # 显示图例
-            ),
-            visualmap_opts=opts.VisualMapOpts(
-                is_show=True,
-                type_="piecewise",  # 使用分段型视觉映射
-                pieces=[
-                    {"value": 0, "label": "暂无", "color": "#C4A39F"},
-                    {"value": 1, "label": "很低", "color": "#81CB31"},
-                    {"value": 2, "label": "低", "color": "#A1FF3D"},
-                    {"value": 3, "label": "中", "color": "#F5EE32"},
-                    {"value": 4, "label": "高", "color": "#FF642E"},
-                    {"value": 5, "label": "很高", "color": "#FF2319"},
-                    {"value": 6, "label": "极高", "color": "#CC0000"}
-                ],
-                pos_left="2%",  # 调整到左侧
-                pos_top="middle",  # 垂直居中
-                orient="vertical",  # 确保纵向显示
-                item_width=20,
-                item_height=15,  # 减小高度使图例更紧凑
-                textstyle_opts=opts.TextStyleOpts(
-                    font_size=12,
-                    color="#333333"
-                ),
-                is_calculable=False  # 禁用数值范围选择
-            )
+            legend_opts=map_legend_opts,
+            visualmap_opts=map_visualmap_opts
         )
         
-        # 额外设置，确保按照正确顺序显示图例
+        # 额外设置，确保按照正确顺序显示图例（按等级数值为各系列分配z值）
         for series in scatter.options.get('series', []):
-            if 'name' in series:
-                level_name = series['name']
-                if level_name in level_map.values():
-                    # 按照level_map中的顺序为其分配z值，确保顺序
-                    for level, name in level_map.items():
-                        if name == level_name:
-                            series['z'] = level
-                            break
-        
-        print("合并地图和散点图...")
-        # 合并地图和散点图
-        grid = Grid(init_opts=init_opts)
-        grid.add(map_chart, grid_opts=opts.GridOpts(pos_left="5%", pos_right="5%", pos_top="5%", pos_bottom="5%"))
-        grid.add(scatter, grid_opts=opts.GridOpts(pos_left="5%", pos_right="5%", pos_top="5%", pos_bottom="5%"))
-        
-        print("添加JS回调函数...")
-        # 添加JS回调函数，强制地图和散点保持同步 - 添加更强大的同步逻辑来修复悬停缩放问题
-        grid.add_js_funcs("""
-        // 修复chart未定义的问题
-        document.addEventListener('DOMContentLoaded', function() {
-            // 使用DOM加载完成事件确保元素存在
-            // 动态查找容器ID - ECharts容器的ID总是在图表渲染时自动生成
-            var chartContainer = document.querySelector('div[_echarts_instance_]');
-            if (chartContainer) {
-                var chart = echarts.getInstanceByDom(chartContainer);
-                
-                // 初始化chart大小
-                function resizeChart() {
-                    if (chart) {
-                        chart.resize();
-                    }
-                }
-                
-                // 监听窗口大小变化
-                window.addEventListener('resize', resizeChart);
-                
-                // 同步两个地图视图的函数，解决悬停缩放位置不一致问题
-                function syncMaps() {
-                    if (chart) {
-                        var option = chart.getOption();
-                        
-                        // 确保两个地图配置存在
-                        if (option.geo && option.geo.length >= 2) {
-                            // 获取第一个地图的中心点和缩放级别
-                            var center = option.geo[0].center;
-                            var zoom = option.geo[0].zoom;
-                            
-                            // 将这些值同步应用到第二个地图
-                            option.geo[1].center = center;
-                            option.geo[1].zoom = zoom;
-                            
-                            // 更新图表，设置notMerge为false以确保只更新变化的部分，不影响其他配置
-                            chart.setOption(option, {notMerge: false});
-                        }
-                        
-                        // 尝试修复图例顺序
-                        if (option.legend && option.legend.length > 0) {
-                            // 设置图例顺序
-                            var orderedLegend = ['暂无', '很低', '低', '中', '高', '很高', '极高'];
-                            option.legend[0].data = orderedLegend;
-                            chart.setOption({legend: option.legend}, {notMerge: false});
-                        }
-                    }
-                }
-                
-                // 监听地图缩放和平移事件
-                chart.on('georoam', function(params) {
-                    syncMaps();
-                });
-                
-                // 监听地图鼠标移入事件，确保悬停时同步
-                chart.on('mouseover', function(params) {
-                    syncMaps();
-                });
-                
-                // 监听地图鼠标移出事件，确保鼠标移出后同步
-                chart.on('mouseout', function(params) {
-                    syncMaps();
-                });
-                
-                // 监听地图点击事件，确保点击后同步
-                chart.on('click', function(params) {
-                    syncMaps();
-                });
-                
-                // 移动设备触摸支持
-                chartContainer.addEventListener('touchstart', function(e) {
-                    // 阻止浏览器默认行为（如页面滚动）
-                    if (e.touches.length > 1) {
-                        e.preventDefault();
-                    }
-                }, { passive: false });
-                
-                chartContainer.addEventListener('touchmove', function(e) {
-                    // 对于多点触摸（缩放），阻止页面滚动
-                    if (e.touches.length > 1) {
-                        e.preventDefault();
-                    }
-                }, { passive: false });
-                
-                // 触摸结束后同步地图
-                chartContainer.addEventListener('touchend', function() {
-                    syncMaps();
-                });
-                
-                // 特别处理移动设备上的缩放
-                var isMobile = /iPhone|iPad|iPod|Android/i.test(navigator.userAgent);
-                if (isMobile) {
-                    // 移动设备上调整图表中的文本大小
-                    chart.setOption({
-                        series: [{
-                            label: { fontSize: 8 }
-                        }]
-                    }, false);
-                }
-                
-                // 初始调整大小和同步地图
-                setTimeout(function() {
-                    resizeChart();
-                    syncMaps();
-                }, 200);
-            }
-        });
-        """)
+            if series.get('name') in level_value_map:
+                series['z'] = level_value_map[series['name']]
         
         print("地图创建完成")
-        return grid
+        return scatter
     except Exception as e:
-        import traceback
         print(f"创建地图时发生异常: {e}")
         traceback.print_exc()
         return None
 
-def create_index_html(output_dir):
-    """创建GitHub Pages适用的主页HTML"""
+def scan_map_dates(maps_dir):
+    """扫描maps目录，返回已生成地图文件对应的日期列表（目录不存在时返回空列表）"""
+    map_dates = []
+    if not os.path.isdir(maps_dir):
+        return map_dates
+    # scandir逐项返回目录条目，文件类型随目录读取一并获得，无需为每个文件单独stat
+    with os.scandir(maps_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            # 文件名格式固定 (map_2025-03-22.html -> 2025-03-22)，按长度和前后缀筛选后直接切片提取日期
+            # （文件名唯一，提取出的日期不会重复）
+            if not (len(name) == 19 and name.startswith("map_") and name.endswith(".html")):
+                continue
+            date_str = name[4:14]
+            if date_str[4] == date_str[7] == '-' and date_str.replace('-', '').isdigit() and entry.is_file():
+                map_dates.append(date_str)
+    return map_dates
+
+def create_index_html(output_dir, gzip_output=False):
+    """创建GitHub Pages适用的主页HTML（gzip_output为True时同时写入预压缩的.gz文件）"""
     # 扫描maps目录以获取所有存在的地图文件
     maps_dir = os.path.join(output_dir, "maps")
-    available_map_dates = []
-    
-    # 如果目录存在，扫描所有地图文件
-    if os.path.exists(maps_dir):
-        map_files = [f for f in os.listdir(maps_dir) if f.startswith("map_") and f.endswith(".html")]
-        for map_file in map_files:
-            # 从文件名中提取日期 (map_2025-03-22.html -> 2025-03-22)
-            date_match = re.search(r'map_(\d{4}-\d{2}-\d{2})\.html', map_file)
-            if date_match:
-                date_str = date_match.group(1)
-                if date_str not in available_map_dates:
-                    available_map_dates.append(date_str)
+    available_map_dates = scan_map_dates(maps_dir)
     
     # 注意：available_dates是全局变量，包含当前数据文件中的日期
     # 确保我们只显示那些已经生成了地图的日期
@@ -623,177 +575,140 @@ def create_index_html(output_dir):
     
     print(f"索引页将包含 {len(displayed_dates)} 个日期的地图")
     
-    index_content = """
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <title>花粉分布地图服务</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <link rel="icon" href="./assets/favicon.svg" type="image/svg+xml">
-    <link rel="icon" href="./favicon.ico" type="image/x-icon">
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 10px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: #fff;
-            padding: 15px;
-            border-radius: 8px;
-            box-shadow: 0 0 10px rgba(0,0,0,0.1);
-        }
-        h1 {
-            color: #333;
-            text-align: center;
-            margin-bottom: 20px;
-            font-size: calc(1.5rem + 1vw);
-        }
-        .controls {
-            margin-bottom: 15px;
-            text-align: center;
-            display: flex;
-            flex-wrap: wrap;
-            justify-content: center;
-            gap: 10px;
-        }
-        select, button {
-            padding: 8px 16px;
-            font-size: 16px;
-            border-radius: 4px;
-        }
-        select {
-            border: 1px solid #ccc;
-            flex: 1;
-            max-width: 200px;
-            min-width: 120px;
-        }
-        button {
-            background-color: #4CAF50;
-            color: white;
-            border: none;
-            cursor: pointer;
-            flex: 0 0 auto;
-        }
-        button:hover {
-            background-color: #45a049;
-        }
-        .map-container {
-            margin-top: 15px;
-            text-align: center;
-            position: relative;
-            width: 100%;
-            height: 0;
-            padding-bottom: 75%; /* 4:3 宽高比 */
-            overflow: hidden;
-        }
-        iframe {
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-        }
-        .footer {
-            margin-top: 15px;
-            text-align: center;
-            color: #666;
-            font-size: 14px;
-        }
-        
-        /* 响应式设计 */
-        @media (max-width: 600px) {
-            body {
-                padding: 5px;
-            }
-            .container {
-                padding: 10px;
-            }
-            h1 {
-                font-size: calc(1.2rem + 1vw);
-                margin-bottom: 15px;
-            }
-            select, button {
-                padding: 8px 12px;
-                font-size: 14px;
-            }
-            .map-container {
-                padding-bottom: 100%; /* 移动设备上使用1:1比例 */
-            }
-            .footer {
-                font-size: 12px;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>全国花粉分布地图服务</h1>
-        <div class="controls">
-            <select id="dateSelect">
-"""
+    # 使用预编译的主页模板渲染（日期选项只使用已确认存在的日期）
+    index_content = index_template.render(
+        dates=displayed_dates,
+        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    )
     
-    # 添加日期选项，只使用已确认存在的日期
-    for date in displayed_dates:
-        index_content += f'                <option value="{date}">{date}</option>\n'
+    # 写入index.html（与地图页面的写入方式一致）
+    index_path = os.path.join(output_dir, "index.html")
+    write_html_file(index_path, index_content, gzip_output)
+    
+    print(f"已创建主页: {index_path}")
     
-    index_content += """
-            </select>
-            <button onclick="updateMap()">查看地图</button>
-        </div>
-        <div class="map-container">
-            <iframe id="mapFrame" src="" frameborder="0"></iframe>
-        </div>
-        <div class="footer">
-            数据更新时间: TIMESTAMP
-        </div>
-    </div>
+    return index_path
 
-    <script>
-        function updateMap() {
-            var date = document.getElementById('dateSelect').value;
-            document.getElementById('mapFrame').src = './maps/map_' + date + '.html';
-        }
-        
-        // 初始化默认地图
-        window.onload = function() {
-            // 获取所有选项
-            var selectElement = document.getElementById('dateSelect');
-            var options = selectElement.options;
-            
-            // 选择最后一个选项（假设选项是按日期排序的，最后一个是最新的）
-            selectElement.selectedIndex = options.length - 1;
-            
-            // 加载选定日期的地图
-            updateMap();
-        }
-    </script>
-</body>
-</html>
-"""
+# 页面模板及地图页面共用的静态样式、脚本所在目录
+templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# 地图页面模板：在pyecharts默认模板基础上直接写入favicon、jQuery和共用样式、脚本的引用，渲染后无需再逐项插入
+map_template_name = "pollen_map_chart.html"
+map_template_env = CurrentConfig.GLOBAL_ENV.overlay(loader=ChoiceLoader([
+    FileSystemLoader(templates_dir),
+    CurrentConfig.GLOBAL_ENV.loader
+]), auto_reload=False)  # 模板在生成过程中不会变化，无需每次渲染都检查文件修改时间
+
+# 主页模板（模块加载时编译一次）
+index_template = map_template_env.get_template("pollen_index.html")
+
+# 预先编译地图页面模板及其引用的pyecharts宏模板（首次编译约占单个页面渲染时间的九成；
+# 以fork方式启动的工作进程直接继承已编译的模板，不必各自重新编译）
+map_template_env.get_template(map_template_name)
+map_template_env.get_template("macro")
+
+# 合并地图页面模板：单个页面内通过下拉框切换日期
+combined_map_template_name = "pollen_all_maps.html"
+
+def create_combined_map_html(maps_dir, gzip_output=False):
+    """生成单页切换日期的合并地图页面，返回文件路径，没有可用地图时返回None
+    （echarts脚本和地图底图只加载一次，切换日期时只替换各等级的散点系列和图例；
+    gzip_output为True时同时写入预压缩的.gz文件）"""
+    payload_by_date = {}
+    latest_chart = None
+    for date in available_dates:
+        chart = create_map(date, date_groups[date])
+        if chart is None:
+            continue
+        options = chart.get_options()
+        payload_by_date[date] = {"series": options.get("series", []), "legend": options.get("legend", [])}
+        latest_chart = chart
+    if latest_chart is None:
+        print("没有可用的地图数据，跳过生成合并地图页面")
+        return None
     
-    # 替换时间戳
-    from datetime import datetime
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    index_content = index_content.replace("TIMESTAMP", timestamp)
+    # 以最新日期的地图作为页面初始内容；各日期的配置嵌入页面脚本中（转义</，避免提前结束script标签）
+    dates = list(payload_by_date)
+    html_content = latest_chart.render_embed(
+        combined_map_template_name, map_template_env,
+        dates=dates,
+        selected_date=dates[-1],
+        payload_json=dump_chart_json(payload_by_date).replace('</', '<\\/')
+    )
+    combined_path = os.path.join(maps_dir, "all_maps.html")
+    write_html_file(combined_path, html_content, gzip_output)
+    print(f"已生成合并地图页面: {combined_path}")
+    return combined_path
+
+def download_chart_assets(assets_dir):
+    """下载echarts和中国地图脚本到assets目录供所有地图页面共用，失败时返回False（继续使用CDN）"""
+    for asset in ("echarts.min.js", "maps/china.js"):
+        target_path = os.path.join(assets_dir, asset)
+        if os.path.exists(target_path):
+            continue
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        try:
+            # 先下载到同目录的临时文件再原子替换，避免中断后留下不完整的共享脚本
+            # （跨文件系统的shutil.move会退化为复制，不再是原子操作）
+            temp_path = f"{target_path}.tmp"
+            urllib.request.urlretrieve(CurrentConfig.ONLINE_HOST + asset, temp_path)
+            os.replace(temp_path, target_path)
+        except Exception as e:
+            print(f"下载地图脚本 {asset} 失败，将使用CDN地址: {e}")
+            return False
+    return True
+
+def init_map_worker(coordinates, js_host):
+    """进程池工作进程初始化：设置城市坐标和脚本位置（spawn启动方式下子进程不会继承父进程的全局变量）"""
+    global city_coordinates, map_js_host
+    city_coordinates = coordinates
+    map_js_host = js_host
+    build_city_coordinate_index()
+
+def render_map_file(date_str, data, maps_dir, gzip_output=False):
+    """为单个日期创建地图并写入HTML文件，返回文件路径，失败时返回None
+    （gzip_output为True时同时写入预压缩的.html.gz文件，供支持静态gzip的服务器直接发送）"""
+    print(f"正在为日期 {date_str} 生成地图...")
+    chart = create_map(date_str, data)
+    if not chart:
+        return None
     
-    # 写入index.html
-    index_path = os.path.join(output_dir, "index.html")
-    with open(index_path, 'w', encoding='utf-8') as f:
-        f.write(index_content)
+    # 渲染到HTML文件
+    map_file_path = os.path.join(maps_dir, f"map_{date_str}.html")
     
-    print(f"已创建主页: {index_path}")
+    # 使用包含favicon、jQuery、响应式支持的页面模板直接渲染为HTML字符串
+    html_content = chart.render_embed(map_template_name, map_template_env)
     
-    return index_path
+    # 写入最终HTML文件（一次编码为UTF-8字节后整块写入，跳过文本层的缓冲与换行转换；
+    # 各日期在进程池中并行渲染，写入也随之并行）
+    write_html_file(map_file_path, html_content, gzip_output)
+    
+    print(f"已生成地图: {map_file_path}")
+    return map_file_path
+
+def load_map_manifest(manifest_path):
+    """加载上次生成时记录的各日期地图输入摘要，格式：{日期: 摘要}，文件不存在或损坏时返回空字典"""
+    try:
+        manifest = read_json_file(manifest_path)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def compute_map_digest(data, build_key):
+    """计算单个日期地图输入的摘要（城市与花粉等级，加上城市坐标、脚本位置等全局渲染参数）"""
+    digest = hashlib.blake2b(build_key, digest_size=16)
+    digest.update(pd.util.hash_pandas_object(data[['城市', '花粉等级']], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
 
-def generate_static_maps(file_path, output_dir=None):
-    """生成所有静态地图文件"""
+def generate_static_maps(file_path, output_dir=None, max_workers=None, gzip_output=False, incremental=True,
+                         combined=False, data=None):
+    """生成所有静态地图文件（max_workers为并行进程数，为1时顺序生成，为None时使用CPU核数；
+    gzip_output为True时为每个地图、主页及assets中的脚本和样式额外生成预压缩的.gz文件；
+    incremental为True时跳过输入数据与上次生成时相同且文件仍存在的日期；
+    combined为True时额外生成单页切换日期的合并地图页面maps/all_maps.html；
+    data为已在内存中的花粉数据DataFrame，传入时不再读取file_path）"""
+    global map_js_host
+    
     # 确保输出目录存在
     if output_dir is None:
         output_dir = "docs"
@@ -815,120 +730,90 @@ def generate_static_maps(file_path, output_dir=None):
     <circle cx="50" cy="50" r="30" fill="#FFD700" opacity="0.7"/>
 </svg>"""
     
-    with open(os.path.join(assets_dir, "favicon.svg"), "w", encoding="utf-8") as f:
-        f.write(favicon_svg)
+    favicon_bytes = favicon_svg.encode('utf-8')
+    write_bytes_if_changed(os.path.join(assets_dir, "favicon.svg"), favicon_bytes)
     
     # 同时创建ico格式的favicon
-    with open(os.path.join(output_dir, "favicon.ico"), "w", encoding="utf-8") as f:
-        f.write(favicon_svg)
+    write_bytes_if_changed(os.path.join(output_dir, "favicon.ico"), favicon_bytes)
     
     print("已创建网站图标文件")
     
+    # 地图页面共用的样式和同步脚本写为独立的静态文件（各日期页面通过link/script引用，浏览器只需下载并缓存一次）
+    for asset_name in ("pollen_map.css", "pollen_map.js"):
+        write_bytes_if_changed(os.path.join(assets_dir, asset_name),
+                               Path(templates_dir, asset_name).read_bytes())
+    
+    # 所有日期的地图页面共用assets目录下的同一份echarts脚本，浏览器只需下载并缓存一次
+    map_js_host = "../assets/" if download_chart_assets(assets_dir) else ""
+    if map_js_host:
+        print("地图页面将使用本地echarts脚本")
+    
+    if gzip_output:
+        precompress_assets(assets_dir)
+    
     # 加载城市坐标
     load_city_coordinates()
     
     # 加载数据
-    if not load_data(file_path):
+    if not load_data(file_path, data):
         print("加载数据失败，无法生成地图")
         return False
     
-    # 为每个日期生成地图
-    generated_maps = []
-    for date in available_dates:
-        print(f"正在为日期 {date} 生成地图...")
-        grid = create_map(date)
-        if grid:
-            # 渲染到HTML文件
-            map_file_path = os.path.join(maps_dir, f"map_{date}.html")
-            
-            # 先生成原始HTML
-            temp_path = os.path.join(maps_dir, f"temp_{date}.html")
-            grid.render(temp_path)
-            
-            # 读取生成的HTML并添加favicon
-            with open(temp_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # 添加favicon引用（在</head>前插入）
-            favicon_tags = """
-    <link rel="icon" href="../assets/favicon.svg" type="image/svg+xml">
-    <link rel="icon" href="../favicon.ico" type="image/x-icon">
-"""
-            html_content = html_content.replace("</head>", favicon_tags + "</head>")
-            
-            # 添加jQuery支持
-            jquery_tag = """
-    <script src="https://cdn.bootcdn.net/ajax/libs/jquery/3.6.0/jquery.min.js"></script>
-"""
-            html_content = html_content.replace("<head>", "<head>" + jquery_tag)
-            
-            # 添加移动设备响应式支持
-            responsive_meta_tag = """
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-"""
-            html_content = html_content.replace("<head>", "<head>" + responsive_meta_tag)
-            
-            # 添加响应式样式
-            responsive_style = """
-    <style>
-        @media (max-width: 600px) {
-            .chart-container {
-                padding: 0 !important;
-            }
-            #container {
-                height: 450px !important;
-            }
-            /* 增强移动设备上的交互体验 */
-            .ec-extension-geo {
-                touch-action: pan-x pan-y !important;
-            }
-            /* 调整文本大小 */
-            .ec-legend-item, .ec-legend-item-text {
-                font-size: 12px !important;
-            }
-        }
-        /* 防止页面超出屏幕 */
-        body {
-            overflow-x: hidden;
-        }
-        /* 增强地图互动性 */
-        #container {
-            touch-action: manipulation;
-            user-select: none;
-            -webkit-tap-highlight-color: transparent;
-        }
-    </style>
-"""
-            html_content = html_content.replace("</head>", responsive_style + "</head>")
-            
-            # 修改formatter函数中的levelMap
-            formatted_form = '"formatter": function(params) {\n    var levelMap = {\n        0: \'\\u6682\\u65e0\',\n        1: \'\\u5f88\\u4f4e\',\n        2: \'\\u4f4e\',\n        3: \'\\u4e2d\',\n        4: \'\\u9ad8\',\n        5: \'\\u5f88\\u9ad8\',\n        6: \'\\u6781\\u9ad8\'\n    };\n    var value = params.value[2];\n    var levelText = levelMap[value] || \'\\u672a\\u77e5\';\n    \n    // \\u68c0\\u6d4b\\u662f\\u5426\\u4e3a\\u79fb\\u52a8\\u8bbe\\u5907\\uff0c\\u5982\\u679c\\u662f\\u5219\\u6dfb\\u52a0\\u63d0\\u793a\n    var isMobile = /iPhone|iPad|iPod|Android/i.test(navigator.userAgent);\n    var touchTip = isMobile ? \'<br/>(\\u70b9\\u51fb\\u53ef\\u653e\\u5927\\u5730\\u56fe)\' : \'\';\n    \n    return params.name + \'<br/>\\u82b1\\u7c89\\u7b49\\u7ea7: \' + levelText + touchTip;\n}'
-            
-            def replace_formatter(match):
-                return formatted_form + ','
-            
-            # 使用更复杂的正则表达式来匹配嵌套的花括号
-            html_content = re.sub(
-                r'"formatter": function\(params\) \{(?:[^{}]|(?:\{[^{}]*\}))*\},',
-                replace_formatter,
-                html_content
-            )
-            
-            # 写入最终HTML文件
-            with open(map_file_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # 删除临时文件
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-            
-            generated_maps.append(map_file_path)
-            print(f"已生成地图: {map_file_path}")
+    # 计算各日期地图输入的摘要，与上次生成时记录的清单比对（历史日期的数据不再变化，
+    # 日常更新时只需重新渲染新增或变化的日期）
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    previous_manifest = load_map_manifest(manifest_path) if incremental else {}
+    # 全局渲染参数：城市坐标、脚本位置，以及页面模板和本脚本的内容（修改模板或生成逻辑后所有页面都会重新生成）
+    build_hash = hashlib.blake2b(
+        json.dumps([city_coordinates, map_js_host], ensure_ascii=False, sort_keys=True).encode('utf-8'),
+        digest_size=16
+    )
+    for source_path in (os.path.join(templates_dir, map_template_name), os.path.abspath(__file__)):
+        if os.path.exists(source_path):
+            build_hash.update(Path(source_path).read_bytes())
+    build_key = build_hash.digest()
+    digests = {date: compute_map_digest(date_groups[date], build_key) for date in available_dates}
+    
+    def is_up_to_date(date):
+        map_file_path = os.path.join(maps_dir, f"map_{date}.html")
+        return (previous_manifest.get(date) == digests[date]
+                and os.path.exists(map_file_path)
+                and (not gzip_output or os.path.exists(map_file_path + '.gz')))
+    
+    pending_dates = [date for date in available_dates if not is_up_to_date(date)]
+    skipped_count = len(available_dates) - len(pending_dates)
+    if skipped_count:
+        print(f"跳过 {skipped_count} 个数据未变化的日期")
+    
+    # 为每个日期生成地图（各日期的数据已在加载时分组，相互独立，可并行渲染）
+    date_frames = [date_groups[date] for date in pending_dates]
+    # 进程数不超过待生成的日期数，避免启动空闲的工作进程
+    worker_count = min(max_workers or os.cpu_count() or 1, len(pending_dates))
+    if worker_count <= 1:
+        map_paths = [render_map_file(date, frame, maps_dir, gzip_output)
+                     for date, frame in zip(pending_dates, date_frames)]
+    else:
+        # 单个日期的渲染很快，按批分发任务以减少进程间的往返次数（每个进程约分到4批，兼顾负载均衡）
+        chunk_size = max(1, len(pending_dates) // (worker_count * 4))
+        with ProcessPoolExecutor(max_workers=worker_count, initializer=init_map_worker,
+                                 initargs=(city_coordinates, map_js_host)) as executor:
+            map_paths = list(executor.map(render_map_file, pending_dates, date_frames,
+                                          [maps_dir] * len(pending_dates),
+                                          [gzip_output] * len(pending_dates),
+                                          chunksize=chunk_size))
+    generated_maps = [path for path in map_paths if path]
+    
+    # 记录本次成功生成及沿用的地图摘要，供下次增量生成比对
+    rendered_dates = {date for date, path in zip(pending_dates, map_paths) if path}
+    manifest = {date: digests[date] for date in available_dates
+                if date in rendered_dates or date not in pending_dates}
+    write_json_file(manifest_path, manifest)
+    
+    if combined:
+        create_combined_map_html(maps_dir, gzip_output)
     
     # 确保index.html中的favicon路径正确
-    create_index_html(output_dir)
+    create_index_html(output_dir, gzip_output)
     
     print(f"已生成 {len(generated_maps)} 个地图文件")
     print("静态地图网站已准备就绪，可部署到GitHub Pages")
@@ -938,6 +823,9 @@ def generate_static_maps(file_path, output_dir=None):
     return True
 
 def main():
+    # argparse只在命令行运行时才需要，作为模块导入时不加载
+    import argparse
+    
     parser = argparse.ArgumentParser(description='花粉分布静态地图生成器')
     # 使用相对路径作为默认数据文件
     default_data_file = 'data/pollen_data_latest.csv'
@@ -945,6 +833,10 @@ def main():
     parser.add_argument('-o', '--output-dir', default='docs', help='输出目录路径 (默认: docs)')
     parser.add_argument('--test', action='store_true', help='生成测试数据并验证地图功能')
     parser.add_argument('--github', action='store_true', help='生成适合GitHub Pages部署的文件')
+    parser.add_argument('--gzip', action='store_true', help='同时为地图页面、主页及共用脚本和样式生成预压缩的.gz文件')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='并行生成地图的进程数，为1时顺序生成 (默认: CPU核数)')
+    parser.add_argument('--full', action='store_true', help='忽略增量生成清单，重新生成所有日期的地图')
+    parser.add_argument('--combined', action='store_true', help='同时生成单页切换日期的合并地图页面 maps/all_maps.html')
     
     args = parser.parse_args()
     
@@ -973,20 +865,20 @@ def main():
     try:
         generate_static_maps(
             file_path=args.file,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            max_workers=args.workers,
+            gzip_output=args.gzip,
+            incremental=not args.full,
+            combined=args.combined
         )
         return 0
     except Exception as e:
         print(f"生成静态地图时出错: {str(e)}")
-        import traceback
         traceback.print_exc()
         return 1
 
 def run_test_mode(output_dir):
     """运行测试模式，生成测试数据并验证地图功能"""
-    import tempfile
-    import csv
-    
     print("运行测试模式：生成测试数据并验证地图功能")
     print(f"输出目录: {output_dir}")
     print("============================================================")
@@ -999,9 +891,10 @@ def run_test_mode(output_dir):
         data_file = 'data/pollen_data_latest.csv'
         if os.path.exists(data_file):
             try:
-                df = pd.read_csv(data_file)
+                # 只需要日期列，不解析其余列；按字符串读取，跳过类型推断（只用于和文件名中的日期比对）
+                df = pd.read_csv(data_file, usecols=lambda column: column == '日期', dtype=str)
                 if '日期' in df.columns:
-                    data_dates = sorted(df['日期'].unique())
+                    data_dates = df['日期'].unique().tolist()
             except Exception as e:
                 print(f"警告: 读取数据文件时出错: {str(e)}")
         
@@ -1013,15 +906,9 @@ def run_test_mode(output_dir):
             ]
         
         # 找出所有不在有效日期范围内的地图文件
-        all_map_files = [f for f in os.listdir(maps_dir) if f.startswith("map_") and f.endswith(".html")]
-        extra_files = []
-        
-        for map_file in all_map_files:
-            date_match = re.search(r'map_(\d{4}-\d{2}-\d{2})\.html', map_file)
-            if date_match:
-                file_date = date_match.group(1)
-                if file_date not in data_dates:
-                    extra_files.append(map_file)
+        valid_dates = set(data_dates)
+        extra_files = [f"map_{file_date}.html" for file_date in scan_map_dates(maps_dir)
+                       if file_date not in valid_dates]
         
         # 删除多余文件
         for file in extra_files:
@@ -1056,19 +943,19 @@ def run_test_mode(output_dir):
         
         print(f"将为以下日期生成测试数据: {', '.join(test_dates)}")
         
-        # 为每个城市在每个测试日期生成数据
-        for city, level in test_cities:
-            for date in test_dates:
-                writer.writerow([date, city, level])
+        # 为每个城市在每个测试日期生成数据（writerows一次写出所有行，避免逐行调用writerow）
+        test_rows = [(date, city, level) for city, level in test_cities for date in test_dates]
+        writer.writerows(test_rows)
         
     print(f"已生成测试数据文件: {test_data_file}")
     print(f"包含 {len(test_cities)} 个城市，每个城市 {len(test_dates)} 个日期的数据")
     
-    # 使用测试数据生成地图
+    # 使用测试数据生成地图（直接传入内存中的数据，不再重新解析刚写出的文件；文件只保留给用户查看）
     try:
         generate_static_maps(
             file_path=test_data_file,
-            output_dir=output_dir
+            output_dir=output_dir,
+            data=pd.DataFrame(test_rows, columns=['日期', '城市', '花粉等级'])
         )
         print("测试模式运行成功！")
         print(f"请查看输出目录: {output_dir}")
@@ -1078,7 +965,6 @@ def run_test_mode(output_dir):
         return 0
     except Exception as e:
         print(f"测试模式运行出错: {str(e)}")
-        import traceback
         traceback.print_exc()
         return 1
     finally:
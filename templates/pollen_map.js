@@ -0,0 +1,106 @@
+// 花粉地图页面共用脚本：强制地图和散点保持同步，并处理窗口缩放与移动设备触摸
+// 修复chart未定义的问题
+document.addEventListener('DOMContentLoaded', function() {
+    // 使用DOM加载完成事件确保元素存在
+    // 动态查找容器ID - ECharts容器的ID总是在图表渲染时自动生成
+    var chartContainer = document.querySelector('div[_echarts_instance_]');
+    if (chartContainer) {
+        var chart = echarts.getInstanceByDom(chartContainer);
+
+        // 初始化chart大小
+        function resizeChart() {
+            if (chart) {
+                chart.resize();
+            }
+        }
+
+        // 监听窗口大小变化
+        window.addEventListener('resize', resizeChart);
+
+        // 同步两个地图视图的函数，解决悬停缩放位置不一致问题
+        function syncMaps() {
+            if (chart) {
+                var option = chart.getOption();
+
+                // 确保两个地图配置存在
+                if (option.geo && option.geo.length >= 2) {
+                    // 获取第一个地图的中心点和缩放级别
+                    var center = option.geo[0].center;
+                    var zoom = option.geo[0].zoom;
+
+                    // 将这些值同步应用到第二个地图
+                    option.geo[1].center = center;
+                    option.geo[1].zoom = zoom;
+
+                    // 更新图表，设置notMerge为false以确保只更新变化的部分，不影响其他配置
+                    chart.setOption(option, {notMerge: false});
+                }
+
+                // 尝试修复图例顺序
+                if (option.legend && option.legend.length > 0) {
+                    // 设置图例顺序
+                    var orderedLegend = ['暂无', '很低', '低', '中', '高', '很高', '极高'];
+                    option.legend[0].data = orderedLegend;
+                    chart.setOption({legend: option.legend}, {notMerge: false});
+                }
+            }
+        }
+
+        // 监听地图缩放和平移事件
+        chart.on('georoam', function(params) {
+            syncMaps();
+        });
+
+        // 监听地图鼠标移入事件，确保悬停时同步
+        chart.on('mouseover', function(params) {
+            syncMaps();
+        });
+
+        // 监听地图鼠标移出事件，确保鼠标移出后同步
+        chart.on('mouseout', function(params) {
+            syncMaps();
+        });
+
+        // 监听地图点击事件，确保点击后同步
+        chart.on('click', function(params) {
+            syncMaps();
+        });
+
+        // 移动设备触摸支持
+        chartContainer.addEventListener('touchstart', function(e) {
+            // 阻止浏览器默认行为（如页面滚动）
+            if (e.touches.length > 1) {
+                e.preventDefault();
+            }
+        }, { passive: false });
+
+        chartContainer.addEventListener('touchmove', function(e) {
+            // 对于多点触摸（缩放），阻止页面滚动
+            if (e.touches.length > 1) {
+                e.preventDefault();
+            }
+        }, { passive: false });
+
+        // 触摸结束后同步地图
+        chartContainer.addEventListener('touchend', function() {
+            syncMaps();
+        });
+
+        // 特别处理移动设备上的缩放
+        var isMobile = /iPhone|iPad|iPod|Android/i.test(navigator.userAgent);
+        if (isMobile) {
+            // 移动设备上调整图表中的文本大小
+            chart.setOption({
+                series: [{
+                    label: { fontSize: 8 }
+                }]
+            }, false);
+        }
+
+        // 初始调整大小和同步地图
+        setTimeout(function() {
+            resizeChart();
+            syncMaps();
+        }, 200);
+    }
+});
@@ -9,9 +9,12 @@
 import os
 import sys
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 测试不需要图形界面，使用Agg后端
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import warnings
+import traceback
 
 # 添加项目根目录到系统路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -31,8 +34,7 @@ except ImportError as e:
 
 # 测试输出目录
 TEST_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'test_output')
-if not os.path.exists(TEST_OUTPUT_DIR):
-    os.makedirs(TEST_OUTPUT_DIR)
+os.makedirs(TEST_OUTPUT_DIR, exist_ok=True)
 
 # 抑制不必要的警告
 warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
@@ -41,12 +43,9 @@ def generate_single_city_data(city_name="北京", days=30):
     """生成单个城市的样本数据"""
     levels = ["未检测", "很低", "较低", "偏高", "较高", "很高", "极高"]
     
-    # 使用真实的日期
+    # 使用真实的日期（截止到今天的连续days天）
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=days-1)
-    
-    # 创建日期列表
-    date_range = [start_date + timedelta(days=i) for i in range(days)]
+    date_strings = pd.date_range(end=end_date, periods=days).strftime("%Y-%m-%d")
     
     # 生成随机趋势（以春季为例，花粉浓度先上升后下降）
     import numpy as np
@@ -62,26 +61,16 @@ def generate_single_city_data(city_name="北京", days=30):
     noise = np.random.normal(0, 0.7, days)
     trend = base_trend + noise
     
-    # 限制范围在0-6之间
-    trend = np.clip(trend, 0, 6)
-    
-    # 创建数据
-    data = []
-    for i, date in enumerate(date_range):
-        level_idx = int(round(trend[i]))
-        level = levels[level_idx]
-        
-        # 添加记录
-        record = {
-            "city": city_name,
-            "addTime": date.strftime("%Y-%m-%d"),
-            "level": level,
-            "level_numeric": level_idx
-        }
-        data.append(record)
+    # 限制范围在0-6之间，并按整列取整得到等级索引
+    level_idx = np.rint(np.clip(trend, 0, 6)).astype(int)
     
-    # 创建DataFrame
-    df = pd.DataFrame(data)
+    # 按列一次性创建DataFrame，无需逐行构造记录
+    df = pd.DataFrame({
+        "city": city_name,
+        "addTime": date_strings,
+        "level": np.array(levels)[level_idx],
+        "level_numeric": level_idx
+    })
     return df
 
 def test_single_city_plot():
@@ -133,7 +122,6 @@ def test_single_city_plot():
     
     except Exception as e:
         print(f"✗ 单城市可视化测试失败: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -143,6 +131,5 @@ if __name__ == "__main__":
         sys.exit(0 if success else 1)
     except Exception as e:
         print(f"程序执行出错: {str(e)}")
-        import traceback
         traceback.print_exc()
         sys.exit(1) 
\ No newline at end of file